@@ -0,0 +1,98 @@
+"""
+Append-only conversation store.
+
+Each message is one JSON line in Data/ChatLog.jsonl. A turn appends only its
+new messages instead of rewriting the whole history, and a crash mid-write can
+at worst leave one torn last line, which is skipped on load. The history is
+parsed once and then served from memory.
+"""
+
+import json
+import os
+import threading
+from dotenv import dotenv_values
+
+env_vars = dotenv_values(".env")
+
+class ConversationStore:
+    def __init__(self, path=os.path.join("Data", "ChatLog.jsonl"), fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.cache = None
+
+    def load(self):
+        """Parse the log once; later reads come from the in-memory cache"""
+        if self.cache is not None:
+            return
+        self.cache = []
+        if not os.path.exists(self.path):
+            legacy_path = os.path.splitext(self.path)[0] + ".json"
+            if os.path.exists(legacy_path):
+                convert_json_log(legacy_path, self.path)
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.cache.append(json.loads(line))
+                    except ValueError:
+                        print(f"Skipping unreadable line in {self.path}")
+
+    def messages(self):
+        """Return a copy of the full history"""
+        with self.lock:
+            self.load()
+            return list(self.cache)
+
+    def tail(self, count):
+        """Return the last `count` messages"""
+        with self.lock:
+            self.load()
+            return self.cache[-count:] if count > 0 else []
+
+    def append(self, *messages):
+        with self.lock:
+            self.load()
+            with open(self.path, "a+b") as f:
+                # Start on a fresh line after a torn last line, so the new messages stay readable
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write("".join(json.dumps(message) + "\n" for message in messages).encode("utf-8"))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.cache.extend(messages)
+
+    def reset(self, messages=()):
+        """Replace the whole history, e.g. when a new session starts"""
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(message) + "\n" for message in messages))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.cache = list(messages)
+
+def convert_json_log(json_path, jsonl_path):
+    """Convert a ChatLog.json array into the JSONL format"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        messages = json.load(f)
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for message in messages:
+            f.write(json.dumps(message) + "\n")
+    print(f"Converted {len(messages)} messages from {json_path} to {jsonl_path}")
+    return len(messages)
+
+chat_store = ConversationStore(fsync=(env_vars.get("ChatLogFsync") or "false").lower() == "true")
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        print("Usage: python -m Backend.ChatStore <ChatLog.json> <ChatLog.jsonl>")
+        sys.exit(1)
+    convert_json_log(sys.argv[1], sys.argv[2])
@@ -1,13 +1,31 @@
 import base64
+import bisect
+import heapq
 from groq import Groq
-from json import load, dump, loads
 import sys
 from dotenv import dotenv_values
 import os
 import json
 import google.generativeai as genai
+from google.generativeai import client as genai_client
+from google.generativeai.types import generation_types
 import re
+import threading
 import traceback
+from collections import OrderedDict
+from Backend.ChatStore import chat_store
+from Backend.ContextWindow import context_window
+from Backend.SpecialistScoring import SpecialistScorer
+from Backend.TextExtraction import (
+    SymptomTracker,
+    AVOID_PATTERNS,
+    RECOMMENDATION_PATTERNS,
+    CACHE_KEY_JUNK,
+    clean_answer,
+    strip_disclaimers,
+    extract_points,
+    find_follow_up
+)
 
 # Load environment variables
 env_values = dotenv_values(".env")
@@ -35,6 +53,111 @@ else:
 client = Groq(api_key=GroqAPIKey)
 messages = []
 
+# Every Gemini call is bounded by this timeout at the client, so a slow call is
+# cancelled instead of being left running in the background
+GEMINI_TIMEOUT = float(env_values.get("GeminiTimeout") or 8)
+gemini_models = {}
+gemini_models_lock = threading.Lock()
+
+def gemini_model(generation_config):
+    """Reuse one GenerativeModel per generation_config"""
+    key = tuple(sorted(generation_config.items()))
+    with gemini_models_lock:
+        if key not in gemini_models:
+            gemini_models[key] = genai.GenerativeModel(
+                model_name="gemini-1.5-flash", # Use a cost-effective and fast model
+                generation_config=generation_config
+            )
+        return gemini_models[key]
+
+def generate_with_timeout(prompt, generation_config, timeout=None):
+    """generate_content on a shared model with a request deadline of GEMINI_TIMEOUT seconds.
+
+    GenerativeModel.generate_content in google-generativeai 0.3 takes no
+    timeout, so the request it would send goes straight to the generative
+    service client, whose timeout cancels the call at the transport. The
+    client's default retries are off, since they would run past the deadline.
+    Raises the client's DeadlineExceeded when it runs out.
+    """
+    request = gemini_model(generation_config)._prepare_request(contents=prompt)
+    response = genai_client.get_default_generative_client().generate_content(
+        request, retry=None, timeout=timeout or GEMINI_TIMEOUT)
+    return generation_types.GenerateContentResponse.from_response(response)
+
+def symptom_cache_key(kind, symptoms, diagnosis=""):
+    """Canonical key: the same symptoms in any order, case or spacing map to one entry"""
+    canonical = sorted({" ".join(CACHE_KEY_JUNK.sub(" ", s.lower()).split()) for s in symptoms if s})
+    return "|".join([kind, ",".join(canonical), " ".join((diagnosis or "").lower().split())])
+
+class EnrichmentCache:
+    """LRU memo of Gemini enrichment results keyed by symptom set and diagnosis.
+
+    Only validated results Gemini actually produced are stored, never fallbacks.
+    When a path is given the entries are loaded from and saved to a JSON file,
+    so a common presentation costs one Gemini call across all sessions.
+    """
+
+    def __init__(self, max_size=1024, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()  # key -> result, least recent first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, result):
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self.save()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for key, result in json.load(f):
+                    self.entries[key] = result
+        except (OSError, ValueError) as e:
+            print(f"Error loading enrichment cache: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([[key, result] for key, result in self.entries.items()], f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving enrichment cache: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+        }
+
+enrichment_cache = EnrichmentCache(
+    max_size=int(env_values.get("EnrichmentCacheSize") or 1024),
+    path=os.path.join("Data", "EnrichmentCache.json") if (env_values.get("EnrichmentCachePersist") or "true").lower() == "true" else None
+)
+
 # RAG integration - using both original and simplified versions
 try:
     from connect_memory_to_llm import Rag as LangChainRag
@@ -50,8 +173,7 @@ from connect_memory_to_llm_simple import (
     Rag as SimpleRag, 
     extract_symptoms_from_query, 
     find_matching_combination, 
-    SYMPTOM_COMBINATIONS, 
-    MEDICAL_DATA
+    get_medical_data
 )
 
 # Initialize patient data
@@ -84,6 +206,57 @@ For recommendations, always format them in clear sections with simple dashes (-)
 
 IMPORTANT: Never use asterisks (*), never use bold formatting, never use markdown symbols in your response. Use clear, direct language as a medical professional would. Speak confidently and professionally, as a real doctor would."""
 
+# Appended to the system prompt in fused mode so one Groq call both classifies and answers.
+# The intent comes first on its own line so the reply can still be streamed after it.
+FUSED_PROMPT = """Before your reply, output exactly one line of the form "INTENT: <intent>" where <intent> is:
+- symptom: the patient describes symptoms, answers your questions, or anything unclear
+- vision: the patient asks you to analyze an image
+- exit: the patient says goodbye or wants to end the conversation (reply with a short farewell)
+Then write your reply to the patient on the following lines."""
+# Only the intent word and its punctuation are consumed: the reply may start on the same line
+INTENT_HEADER = re.compile(r'^\s*INTENT:\s*(symptom|vision|exit)\b[ \t]*[.:\-]?[ \t]*\n?', re.IGNORECASE)
+
+# Optionally, the conclusion turn also carries the diagnosis as JSON on a trailing
+# line, which goes straight to demographic.json instead of being scraped from the text
+STRUCTURED_DIAGNOSIS = (env_values.get("StructuredDiagnosis") or "false").lower() == "true"
+DIAGNOSIS_MARKER = "DIAGNOSIS_JSON:"
+STRUCTURED_PROMPT = """Only when your reply concludes with a diagnosis and recommendations, end it with one final line of the form
+DIAGNOSIS_JSON: {"diagnosis": "...", "recommendations": ["..."], "avoid": ["..."], "follow_up": "..."}
+with the same content as your reply. That line is read by software and never shown to the patient, so your reply above it must still be complete. Do not output it on any other turn."""
+
+class TrailerSplitter:
+    """Keep a trailing marker line out of streamed text.
+
+    feed() returns the text that is safe to show. Everything after the marker
+    is collected in `trailer`, and text that could be the start of the marker
+    is held back until the next delta settles it.
+    """
+
+    def __init__(self, marker):
+        self.marker = marker
+        self.pending = ""
+        self.trailer = None
+
+    def feed(self, delta):
+        if self.trailer is not None:
+            self.trailer += delta
+            return ""
+        self.pending += delta
+        index = self.pending.find(self.marker)
+        if index != -1:
+            visible, self.trailer = self.pending[:index], self.pending[index + len(self.marker):]
+            self.pending = ""
+            return visible
+        keep = next((k for k in range(min(len(self.marker) - 1, len(self.pending)), 0, -1)
+                     if self.pending.endswith(self.marker[:k])), 0)
+        visible = self.pending[:len(self.pending) - keep]
+        self.pending = self.pending[len(visible):]
+        return visible
+
+    def flush(self):
+        visible, self.pending = self.pending, ""
+        return visible
+
 def encode_image(image_path):
     with open(image_path, "rb") as image_file:
         return base64.b64encode(image_file.read()).decode('utf-8')
@@ -91,204 +264,19 @@ def encode_image(image_path):
 def get_conversation_count():
     """Count the number of user messages in the chat history"""
     try:
-        with open("Data/Chatlog.json", "r") as f:
-            messages = load(f)
-            return sum(1 for msg in messages if msg["role"] == "user")
+        return sum(1 for msg in chat_store.messages() if msg["role"] == "user")
     except:
         return 0
 
+symptom_tracker = SymptomTracker()
+
 def extract_symptoms_from_chat(messages):
     """Extract symptoms from the chat history more accurately"""
-    # Join all user messages to analyze
-    user_text = ""
-    first_message_found = False
-    
-    for msg in messages:
-        if msg["role"] == "user":
-            # Extract actual user input from prompt
-            content = msg["content"]
-            
-            # Special handling for first message - often has greeting with symptoms
-            if not first_message_found:
-                first_message_found = True
-                # Check for common first message pattern like "Hi doctor I am having fever and cough"
-                if "hi doctor" in content.lower() or "hello doctor" in content.lower():
-                    # Try to extract symptoms from greeting-style first message
-                    having_match = re.search(r'(?:i am|i\'m) having ([^\.]+)', content.lower())
-                    if having_match:
-                        symptom_text = having_match.group(1).strip()
-                        # Further process to split combined symptoms
-                        if "and" in symptom_text or "," in symptom_text:
-                            parts = re.split(r',|\sand\s', symptom_text)
-                            for part in parts:
-                                specific_part = part.strip()
-                                if specific_part and len(specific_part) > 3:
-                                    user_text += f"I have {specific_part}. "
-                        else:
-                            user_text += f"I have {symptom_text}. "
-            
-            # Try to find just the user's actual symptoms by removing system instructions
-            parts = content.split("Now, respond to the patient's latest query:")
-            if len(parts) > 1:
-                user_text += parts[1].strip() + " "
-            else:
-                # Find the actual query after the instructions
-                match = re.search(r'real doctor would\.\s*(.*?)$', content, re.DOTALL)
-                if match:
-                    user_text += match.group(1).strip() + " "
-                else:
-                    # If no special processing was done above, add content normally
-                    if not (first_message_found and "hi doctor" in content.lower()):
-                        user_text += content + " "
-    
-    # Look for common symptom patterns
-    symptoms = []
-    
-    # Pattern matching for symptoms
-    symptom_patterns = [
-        r'(pain|ache|discomfort) (in|on) (?:my|the) ([a-z\s]+)',  # pain in my abdomen
-        r'([a-z\s]+) (pain|ache|discomfort)',  # abdominal pain
-        r'(?:I have|I\'m having|experiencing|having|with) ([a-z\s]+)',  # I have fever
-        r'(dark|cloudy|pink|red|clear) (urine|pee|urination)',  # dark urine
-        r'(difficulty|trouble|problem) (with|in) ([a-z\s]+)',  # difficulty in breathing
-        r'(fever|cough|headache|nausea|vomiting|dizziness|fatigue|cold|sore throat|runny nose|congestion|chills)',  # direct symptoms - added more terms
-        r'(?:my|the) ([a-z\s]+) (?:is|are) ([a-z\s]+)',  # my urine is pink
-        r'(?:been having|suffering from|troubled with) ([a-z\s]+)',  # been having fever
-        r'(?:since|for) (?:last|past|about)? ?(\d+) (days?|weeks?|months?)', # time-based context for symptoms
-    ]
-    
-    for pattern in symptom_patterns:
-        matches = re.finditer(pattern, user_text.lower())
-        for match in matches:
-            if match.group():
-                symptom = match.group().strip()
-                # Clean up the symptom text
-                symptom = re.sub(r'i have |i\'m having |experiencing |having |with ', '', symptom)
-                # Format specific types of symptoms better
-                if "pain in " in symptom:
-                    parts = symptom.split("pain in ")
-                    if len(parts) > 1:
-                        symptom = f"{parts[1].strip()} pain"
-                
-                if symptom and symptom not in symptoms:
-                    symptoms.append(symptom)
-    
-    # Do additional checks for specific symptoms
-    if "urine" in user_text.lower() or "urination" in user_text.lower():
-        if "pink" in user_text.lower() and "pink urine" not in symptoms:
-            symptoms.append("pink urine")
-        if "dark" in user_text.lower() and "dark urine" not in symptoms:
-            symptoms.append("dark urine")
-        if "pain" in user_text.lower() and "painful urination" not in symptoms:
-            symptoms.append("painful urination")
-    
-    if "abdomen" in user_text.lower() and "pain" in user_text.lower():
-        if "abdominal pain" not in symptoms:
-            symptoms.append("abdominal pain")
-    
-    # Clean up symptoms
-    cleaned_symptoms = []
-    for symptom in symptoms:
-        # Remove duplicates and refine wording
-        clean_symptom = symptom.strip().lower()
-        
-        # Process compound symptoms like "fever and cough"
-        if " and " in clean_symptom:
-            parts = clean_symptom.split(" and ")
-            for part in parts:
-                part = part.strip()
-                if part and len(part) > 2 and not any(s == part for s in cleaned_symptoms):
-                    cleaned_symptoms.append(part)
-        # Check if symptom contains multiple symptoms separated by commas
-        elif "," in clean_symptom:
-            parts = clean_symptom.split(",")
-            for part in parts:
-                part = part.strip()
-                if part and len(part) > 2 and not any(s == part for s in cleaned_symptoms):
-                    cleaned_symptoms.append(part)
-        # Handle single symptom
-        elif clean_symptom and not any(s == clean_symptom for s in cleaned_symptoms):
-            cleaned_symptoms.append(clean_symptom)
-    
-    return cleaned_symptoms
-
-def format_symptoms_with_gemini(symptoms):
-    """Use Gemini to clean and format the symptoms into clear bullet points with both common and medical terms."""
-    if not symptoms or len(symptoms) == 0:
-        return []
-    
-    # Fallback formatting if Gemini is not available or fails
-    def basic_formatting(symptom_list):
-        return [symptom[0].upper() + symptom[1:] if symptom else "" for symptom in symptom_list]
+    return symptom_tracker.update(messages)
 
-    if not GEMINI_API_KEY:
-        print("Gemini API Key not available. Using basic symptom formatting.")
-        return basic_formatting(symptoms)
-        
-    try:
-        # Format the prompt for Gemini
-        prompt = f"""Given these raw patient symptoms extracted from conversation: {', '.join(symptoms)}
-        
-        Please reformat these into clear, understandable bullet points using BOTH common and medical terminology.
-        
-        Format each symptom as: "Common name (Medical term)" - for example "Headache (Cephalalgia)" or "Fever (Pyrexia)"
-        If there is no specific medical term, just use the common name.
-        
-        Return ONLY the bullet points, one per line, without explanations or additional text.
-        Please ensure the common name comes first, followed by the medical term in parentheses.
-        
-        Example Input: ['i feel feverish', 'coughing a lot', 'my throat hurts']
-        Example Output:
-        • Fever (Pyrexia)
-        • Persistent cough (Tussis)
-        • Sore throat (Pharyngitis)
-        """
-        
-        # Configure Gemini model parameters
-        generation_config = {
-            "temperature": 0.2, # Slightly lower temperature for more focused output
-            "top_p": 0.95,
-            "top_k": 0,
-            "max_output_tokens": 1024,
-        }
-        
-        # Get Gemini's response
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash", # Use a cost-effective and fast model
-            generation_config=generation_config
-        )
-        
-        response = model.generate_content(prompt)
-        
-        # Parse the response to extract bullet points
-        formatted_text = response.text
-        bullet_points = []
-        
-        # Extract each bullet point
-        for line in formatted_text.split('\n'):
-            line = line.strip()
-            if line and line.startswith('•'):
-                # Clean up the bullet point text
-                clean_point = line.lstrip('• ').strip()
-                if clean_point:
-                    bullet_points.append(clean_point)
-            elif line and not line.startswith('Example'): # Handle cases where Gemini might not use bullets but gives points
-                 clean_point = line.strip()
-                 if clean_point and len(clean_point) > 3: # Basic check for valid point
-                     bullet_points.append(clean_point)
-
-        # If Gemini didn't return proper bullet points, use basic formatting
-        if not bullet_points:
-            print("Gemini did not return expected bullet points. Using basic formatting.")
-            return basic_formatting(symptoms)
-        
-        return bullet_points
-        
-    except Exception as e:
-        print(f"Error formatting symptoms with Gemini: {e}. Using basic formatting.")
-        traceback.print_exc() # Print detailed traceback for debugging
-        # Fall back to basic formatting if Gemini fails
-        return basic_formatting(symptoms)
+def basic_symptom_formatting(symptom_list):
+    """Fallback formatting if Gemini is not available or fails"""
+    return [symptom[0].upper() + symptom[1:] if symptom else "" for symptom in symptom_list]
 
 def generate_rag_query(symptoms):
     """Generate a comprehensive query for the RAG system based on symptoms"""
@@ -382,97 +370,198 @@ def Rag(query):
             print(f"Error in fallback RAG function: {e2}")
             return "Unable to retrieve medical information at this time."
 
+def load_chat_messages(Query):
+    """Load the chat history and append the new user message"""
+    messages = chat_store.messages()
+    messages.append({"role": "user", "content": Query})
+    return messages
+
+def create_completion(messages, Query, image_path=None, fused=False, structured=False):
+    """Start a streaming Groq completion for the latest user message"""
+    system_prompt = "You are DocBot, an AI Doctor assisting patients. Do not use any markdown formatting like asterisks, bold, or italics in your responses."
+    if image_path:
+        # For image processing, we'll use encoded image
+        encoded_image = encode_image(image_path)
+        
+        # Since Groq has limited vision capabilities, we'll use LLaMA 3 vision model
+        return client.chat.completions.create(
+            model="llama-3.2-11b-vision-preview",  # Groq's vision model
+            messages=[
+                *context_window.build(system_prompt, messages[:-1]),
+                {
+                    "role": "user", 
+                    "content": [
+                        {"type": "text", "text": MULTIMODAL_PROMPT + " " + Query},
+                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded_image}"}}
+                    ]
+                }
+            ],
+            max_tokens=512,
+            temperature=0.7,
+            top_p=1,
+            stream=True
+        )
+    
+    if fused:
+        system_prompt += "\n\n" + FUSED_PROMPT
+    if structured:
+        system_prompt += "\n\n" + STRUCTURED_PROMPT
+    
+    # Process without image - use Groq's LLaMA model
+    return client.chat.completions.create(
+        model="llama-3.3-70b-versatile",  # Use Groq's powerful LLaMA model
+        messages=context_window.build(system_prompt, messages),
+        max_tokens=512,
+        temperature=0.7,
+        top_p=1,
+        stream=True
+    )
+
+def parse_diagnosis_payload(trailer):
+    """Validate the DIAGNOSIS_JSON trailer; None unless it names a diagnosis"""
+    data = parse_enrichment_response(trailer or "")
+    diagnosis = data.get("diagnosis")
+    if not isinstance(diagnosis, str) or not diagnosis.strip():
+        return None
+    follow_up = data.get("follow_up")
+    return {
+        "diagnosis": diagnosis.replace("*", "").strip(),
+        "recommendations": clean_string_list(data.get("recommendations")),
+        "avoid": clean_string_list(data.get("avoid")),
+        "follow_up": follow_up.replace("*", "").strip() if isinstance(follow_up, str) else "",
+    }
+
+def finish_chat_turn(messages, answer, diagnosis=None):
+    """Clean up the streamed answer, persist the chat log and update demographics"""
+    # Clean up the answer - remove all asterisks, markdown formatting
+    answer = clean_answer(answer)
+    
+    # Add the assistant's response to the chat history
+    messages.append({"role": "assistant", "content": answer})
+    
+    # Append only this turn's messages to the chat history
+    chat_store.append(*messages[-2:])
+    
+    # Update demographic information in the background so the reply is not held up
+    demographic_enricher.submit(messages, diagnosis)
+    
+    return answer
+
 def ChatBot(Query, image_path=None):
     """Chat bot function with improved demographic tracking"""
     try:
-        # Load the chat history
-        with open("Data/ChatLog.json", "r", encoding="utf-8") as f:
-            messages = json.load(f)
-        
-        # Add the new user message
-        messages.append({"role": "user", "content": Query})
-        
-        # Get a response from the API
-        if image_path:
-            # For image processing, we'll use encoded image
-            encoded_image = encode_image(image_path)
-            
-            # Since Groq has limited vision capabilities, we'll use LLaMA 3 vision model
-            completion = client.chat.completions.create(
-                model="llama-3.2-11b-vision-preview",  # Groq's vision model
-                messages=[
-                    {"role": "system", "content": "You are DocBot, an AI Doctor assisting patients. Do not use any markdown formatting like asterisks, bold, or italics in your responses."},
-                    *[{"role": m["role"], "content": m["content"]} for m in messages[:-1]],
-                    {
-                        "role": "user", 
-                        "content": [
-                            {"type": "text", "text": MULTIMODAL_PROMPT + " " + Query},
-                            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded_image}"}}
-                        ]
-                    }
-                ],
-                max_tokens=512,
-                temperature=0.7,
-                top_p=1,
-                stream=True
-            )
+        stream = ChatBotStream(Query, image_path)
+        for _ in stream:
+            pass
+        return stream.answer
+    
+    except Exception as e:
+        print(f"Error in ChatBot: {str(e)}")
+        return f"I apologize, but I encountered an error: {str(e)}"
+
+class ChatBotStream:
+    """Iterate over the answer deltas as Groq streams them.
+
+    Once the iteration ends the cleaned answer is available as `answer`, and the
+    chat log and demographic data have been updated exactly as ChatBot does.
+    Errors are reported the same way as ChatBot: a single apology delta.
+
+    With fused=True the same call also classifies the query: the model's
+    "INTENT: ..." header line is stripped from the stream and exposed as
+    `intent` (symptom, vision or exit; symptom when the header is missing).
+
+    With StructuredDiagnosis=true in .env, a conclusion turn's DIAGNOSIS_JSON
+    trailer is kept out of the stream and exposed as `diagnosis` (None on
+    other turns).
+    """
+
+    def __init__(self, Query, image_path=None, fused=False):
+        self.Query = Query
+        self.image_path = image_path
+        self.fused = fused and not image_path
+        self.intent = "vision" if image_path else "symptom"
+        self.answer = ""
+        self.splitter = TrailerSplitter(DIAGNOSIS_MARKER) if STRUCTURED_DIAGNOSIS and not image_path else None
+        self.diagnosis = None
+
+    def visible(self, text):
+        """The part of the text to show and speak"""
+        return self.splitter.feed(text) if self.splitter else text
+
+    def read_intent(self, header):
+        """Split the intent line off the start of the stream; None while it may still be arriving"""
+        match = INTENT_HEADER.match(header)
+        # Until more text follows the match, a longer separator may still be arriving
+        if match and (match.end() < len(header) or match.group(0).endswith("\n") or len(header) > 80):
+            self.intent = match.group(1).lower()
+            return header[match.end():].lstrip()
+        if "\n" in header or len(header) > 80:
+            return header  # No usable header, keep the default intent
+        return None
+
+    def __iter__(self):
+        try:
+            messages = load_chat_messages(self.Query)
+            completion = create_completion(messages, self.Query, self.image_path, self.fused, self.splitter is not None)
             
             # Stream the response
             answer = ""
+            header = "" if self.fused else None
             for chunk in completion:
-                if chunk.choices[0].delta.content:
-                    answer += chunk.choices[0].delta.content
-        else:
-            # Process without image - use Groq's LLaMA model
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",  # Use Groq's powerful LLaMA model
-                messages=[
-                    {"role": "system", "content": "You are DocBot, an AI Doctor assisting patients. Do not use any markdown formatting like asterisks, bold, or italics in your responses."},
-                    *[{"role": m["role"], "content": m["content"]} for m in messages],
-                ],
-                max_tokens=512,
-                temperature=0.7,
-                top_p=1,
-                stream=True
-            )
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if header is not None:
+                    header += delta
+                    delta = self.read_intent(header)
+                    if delta is None:
+                        continue
+                    header = None
+                delta = self.visible(delta)
+                if not delta:
+                    continue
+                answer += delta
+                yield delta
             
-            # Stream the response
-            answer = ""
-            for chunk in completion:
-                if chunk.choices[0].delta.content:
-                    answer += chunk.choices[0].delta.content
-        
-        # Clean up the answer - remove all asterisks, markdown formatting
-        answer = answer.strip()
-        answer = re.sub(r'\*+', '', answer)  # Remove all asterisks
-        answer = re.sub(r'#+\s+', '', answer)  # Remove markdown headers
-        answer = re.sub(r'\n\s*-\s+', '\n- ', answer)  # Standardize bullet points
-        
-        # Add the assistant's response to the chat history
-        messages.append({"role": "assistant", "content": answer})
-        
-        # Save the updated chat history
-        with open("Data/ChatLog.json", "w", encoding="utf-8") as f:
-            json.dump(messages, f, indent=4)
-        
-        # Update demographic information
-        update_demographic_from_chat(messages)
+            if header:
+                # The whole reply fit in the header buffer
+                rest = INTENT_HEADER.match(header)
+                if rest:
+                    self.intent = rest.group(1).lower()
+                    header = header[rest.end():].lstrip()
+                header = self.visible(header)
+                answer += header
+                if header.strip():
+                    yield header
+            
+            if self.splitter:
+                tail = self.splitter.flush()
+                answer += tail
+                if tail.strip():
+                    yield tail
+                self.diagnosis = parse_diagnosis_payload(self.splitter.trailer)
+            
+            self.answer = finish_chat_turn(messages, answer, self.diagnosis)
         
-        return answer
-    
-    except Exception as e:
-        print(f"Error in ChatBot: {str(e)}")
-        return f"I apologize, but I encountered an error: {str(e)}"
+        except Exception as e:
+            print(f"Error in ChatBot: {str(e)}")
+            self.answer = f"I apologize, but I encountered an error: {str(e)}"
+            yield self.answer
 
-def update_demographic_from_chat(messages):
-    """Update demographic.json with information extracted from the chat"""
+def update_demographic_from_chat(messages, is_current=lambda: True, diagnosis_payload=None):
+    """Update demographic.json with information extracted from the chat.
+
+    A diagnosis_payload from the conclusion turn (see parse_diagnosis_payload)
+    is written as is, instead of scraping the last answer and refining its
+    recommendations with Gemini.
+
+    Returns the updated data, or None if it failed or is_current() reports that
+    a newer turn has superseded this one (the file is then left untouched).
+    """
     try:
         # Extract symptoms from the chat
         raw_symptoms = extract_symptoms_from_chat(messages)
         
-        # Use Gemini to format the symptoms nicely
-        symptoms = format_symptoms_with_gemini(raw_symptoms)
-        
         # Ensure demographic.json exists with default structure
         if not os.path.exists("Data/demographic.json"):
             with open("Data/demographic.json", "w", encoding="utf-8") as f:
@@ -489,19 +578,32 @@ def update_demographic_from_chat(messages):
         with open("Data/demographic.json", "r", encoding="utf-8") as f:
             demographic = json.load(f)
         
+        # Get a precise diagnosis from our simplified RAG system. It only needs the raw
+        # symptoms, so it is known before the single Gemini enrichment call below.
+        if diagnosis_payload:
+            diagnosis = diagnosis_payload["diagnosis"]
+        elif raw_symptoms:
+            diagnosis = get_precise_diagnosis_from_rag(raw_symptoms)
+        else:
+            diagnosis = demographic.get("diagnosis", "")
+        if raw_symptoms:
+            demographic["differential"] = differential_from_rag(raw_symptoms)
+        
+        # One Gemini call formats the symptoms and recommendations and picks the specialist
+        enrichment = enrich_with_gemini(raw_symptoms, diagnosis, recommendations=diagnosis_payload is None)
+        symptoms = enrichment["formatted_symptoms"]
+        
         # Update symptoms (add new ones, don't duplicate)
         # Only update if new formatted symptoms are different or demographic file was empty
         if symptoms and (not demographic.get("symptoms") or set(symptoms) != set(demographic.get("symptoms", []))):
             demographic["symptoms"] = symptoms  # Replace with cleaned and formatted symptoms
             print(f"Updated demographic symptoms: {symptoms}") # Debug print
             
-            # Get a precise diagnosis from our simplified RAG system using the updated symptoms
-            precise_diagnosis = get_precise_diagnosis_from_rag(symptoms)
-            demographic["diagnosis"] = precise_diagnosis
-            print(f"Updated diagnosis from RAG: {precise_diagnosis}")
-        elif not symptoms and demographic.get("symptoms"): # If Gemini fails but we had symptoms before, keep old ones
+            demographic["diagnosis"] = diagnosis
+            print(f"Updated diagnosis: {diagnosis}")
+        elif not symptoms and demographic.get("symptoms"): # If no symptoms were found but we had some before, keep old ones
             pass # Keep existing symptoms
-        else: # If symptoms haven't changed or Gemini returned empty
+        else: # If symptoms haven't changed or none were found
              print("Symptoms unchanged or empty, not updating.")
         
         # Check for recommendations in the latest assistant message
@@ -511,37 +613,19 @@ def update_demographic_from_chat(messages):
                 last_assistant_msg = msg["content"]
                 break
         
-        if last_assistant_msg:
+        if diagnosis_payload:
+            # DocBot already gave the conclusion as structured data
+            print(f"Using structured diagnosis from DocBot: {diagnosis_payload['diagnosis']}")
+            demographic["diagnosis"] = diagnosis_payload["diagnosis"]
+            for key in ("recommendations", "avoid", "follow_up"):
+                if diagnosis_payload[key]:
+                    demographic[key] = diagnosis_payload[key]
+        elif last_assistant_msg:
             # Remove asterisks from the message
             last_assistant_msg = last_assistant_msg.replace("*", "")
             
             # Look for recommendations with improved patterns
-            recommendations = []
-            recommendation_patterns = [
-                r"Recommendations?:?\s*(.*?)(?:Avoid|Follow-up|When to see|$)",
-                r"(?:I recommend|You should|It's advisable to|Consider)\s+([^\.]+)",
-                r"Treatment(?:\s+includes|\s+options)?:?\s*(.*?)(?:Avoid|Follow-up|When to see|$)"
-            ]
-            
-            for pattern in recommendation_patterns:
-                matches = re.finditer(pattern, last_assistant_msg, re.DOTALL | re.IGNORECASE)
-                for match in matches:
-                    if match.groups():
-                        rec_text = match.group(1).strip()
-                        # Split by bullet points or new lines with dashes
-                        bullet_points = re.findall(r"[-•]([^-•]+)", rec_text)
-                        if bullet_points:
-                            for point in bullet_points:
-                                point = point.strip()
-                                if point and point not in recommendations and len(point) > 5:
-                                    recommendations.append(point.capitalize())
-                        else:
-                            # Try to split by sentences if no bullet points
-                            sentences = re.split(r'\.(?=\s|$)', rec_text)
-                            for sentence in sentences:
-                                sentence = sentence.strip()
-                                if sentence and len(sentence) > 10:  # Avoid very short sentences
-                                    recommendations.append(sentence.capitalize())
+            recommendations = extract_points(RECOMMENDATION_PATTERNS, last_assistant_msg)
             
             # If no recommendations found, add common recommendations based on diagnosis
             if not recommendations and demographic["diagnosis"]:
@@ -564,9 +648,8 @@ def update_demographic_from_chat(messages):
             current_diagnosis_for_recs = demographic.get("diagnosis", "")
             if current_diagnosis_for_recs and current_diagnosis_for_recs.lower() != "unknown":
                 print(f"Diagnosis '{current_diagnosis_for_recs}' found, reformatting recommendations for better presentation.")
-                current_symptoms_for_recs = demographic.get("symptoms", [])
                 # Just using Gemini to enhance and reformat DocBot's recommendations
-                reformatted_recs = get_refined_recommendations_with_gemini(current_symptoms_for_recs, current_diagnosis_for_recs)
+                reformatted_recs = enrichment["recommendations"]
                 # Only overwrite if reformatted recs are actually generated and non-empty
                 if reformatted_recs: 
                     demographic["recommendations"] = reformatted_recs
@@ -583,30 +666,7 @@ def update_demographic_from_chat(messages):
                     demographic["recommendations"] = []
 
             # Look for things to avoid with improved patterns
-            avoid = []
-            avoid_patterns = [
-                r"Avoid:?\s*(.*?)(?:Follow-up|When to see|$)",
-                r"(?:Don't|Do not|Avoid|Stay away from|Limit)\s+([^\.]+)",
-                r"It's best to avoid\s+([^\.]+)"
-            ]
-            
-            for pattern in avoid_patterns:
-                matches = re.finditer(pattern, last_assistant_msg, re.DOTALL | re.IGNORECASE)
-                for match in matches:
-                    if match.groups():
-                        avoid_text = match.group(1).strip()
-                        bullet_points = re.findall(r"[-•]([^-•]+)", avoid_text)
-                        if bullet_points:
-                            for point in bullet_points:
-                                point = point.strip()
-                                if point and point not in avoid and len(point) > 5:
-                                    avoid.append(point.capitalize())
-                        else:
-                            sentences = re.split(r'\.(?=\s|$)', avoid_text)
-                            for sentence in sentences:
-                                sentence = sentence.strip()
-                                if sentence and len(sentence) > 10:
-                                    avoid.append(sentence.capitalize())
+            avoid = extract_points(AVOID_PATTERNS, last_assistant_msg)
             
             # If no avoid items found, add common ones based on diagnosis
             if not avoid and demographic["diagnosis"]:
@@ -629,19 +689,7 @@ def update_demographic_from_chat(messages):
                 demographic["avoid"] = avoid
             
             # Look for follow-up with improved patterns
-            follow_up = ""
-            follow_up_patterns = [
-                r"Follow-up:?\s*(.*?)(?:$)",
-                r"(?:See|Consult|Visit) (?:a|your) doctor\s+([^\.]+)",
-                r"If symptoms (?:persist|worsen|continue)\s+([^\.]+)"
-            ]
-            
-            for pattern in follow_up_patterns:
-                match = re.search(pattern, last_assistant_msg, re.DOTALL | re.IGNORECASE)
-                if match:
-                    follow_up = match.group(1).strip()
-                    if follow_up:
-                        break
+            follow_up = find_follow_up(last_assistant_msg)
             
             # If no follow-up found, add a common one based on diagnosis
             if not follow_up and demographic["diagnosis"]:
@@ -658,20 +706,76 @@ def update_demographic_from_chat(messages):
                 demographic["follow_up"] = follow_up.capitalize()
         
         # --- Get Specialist Recommendation from Gemini --- 
-        # Use the potentially updated symptoms and diagnosis
-        current_symptoms = demographic.get("symptoms", [])
-        current_diagnosis = demographic.get("diagnosis", "")
-        recommended_specialist = get_specialist_recommendation_with_gemini(current_symptoms, current_diagnosis)
-        demographic["recommended_specialist_type"] = recommended_specialist
+        # Validated against SPECIALIST_KEYWORDS by the enrichment call
+        demographic["recommended_specialist_type"] = enrichment["specialist"]
         # --- End Specialist Recommendation ---
 
+        if not is_current():
+            print("Demographic update superseded by a newer turn, discarding.")
+            return None
+
         # Save updated demographic data
         with open("Data/demographic.json", "w", encoding="utf-8") as f:
             json.dump(demographic, f, indent=4)
+        return demographic
 
     except Exception as e:
         print(f"Error updating demographic information: {e}")
         traceback.print_exc()
+        return None
+
+class DemographicEnricher:
+    """Runs update_demographic_from_chat on a background thread.
+
+    Only the newest submitted turn is kept waiting; a job that is still running
+    when a newer turn arrives finishes but its result is discarded. A structured
+    diagnosis from a superseded turn is carried into the job that replaces it
+    (unless that turn brings its own), so it still reaches the listeners, which
+    receive the demographic data each time a current job completes.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = None
+        self.generation = 0
+        self.carried_diagnosis = None  # newest structured diagnosis not yet delivered
+        self.listeners = []
+        self.thread = None
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def submit(self, messages, diagnosis=None):
+        with self.condition:
+            self.generation += 1
+            if diagnosis is None:
+                diagnosis = self.carried_diagnosis
+            self.carried_diagnosis = diagnosis
+            self.pending = (self.generation, list(messages), diagnosis)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                generation, messages, diagnosis = self.pending
+                self.pending = None
+            demographic = update_demographic_from_chat(messages, lambda: generation == self.generation, diagnosis)
+            if demographic is not None and generation == self.generation:
+                with self.condition:
+                    if generation == self.generation:
+                        self.carried_diagnosis = None
+                for callback in self.listeners:
+                    try:
+                        callback(demographic)
+                    except Exception as e:
+                        print(f"Error in demographic listener: {e}")
+
+demographic_enricher = DemographicEnricher()
 
 # Define specialist categories and associated keywords
 SPECIALIST_KEYWORDS = {
@@ -698,91 +802,44 @@ SPECIALIST_KEYWORDS = {
     "Allergist": ["allergy", "food allergy", "hay fever", "hives", "eczema", "asthma", "allergic reaction", "sinus"]
 }
 
-def get_specialist_recommendation_with_gemini(symptoms, diagnosis):
-    """Use Gemini to classify symptoms/diagnosis into a specialist category."""
+def match_specialist(recommended_type):
+    """Map Gemini's answer onto a SPECIALIST_KEYWORDS key, or None if nothing matches"""
+    if not isinstance(recommended_type, str) or not recommended_type.strip():
+        return None
+    recommended_type = recommended_type.strip()
+    if recommended_type in SPECIALIST_KEYWORDS:
+        print(f"Gemini classified symptoms under specialist: {recommended_type}")
+        return recommended_type
+    print(f"Gemini returned an invalid specialist type key: '{recommended_type}'. Attempting fallback match.")
+    # More robust fallback matching
+    for key in SPECIALIST_KEYWORDS:
+        # Try to find the closest match
+        if key.lower() == recommended_type.lower():
+            print(f"Exact case-insensitive match to: {key}")
+            return key
+        elif key.lower() in recommended_type.lower() or recommended_type.lower() in key.lower():
+            print(f"Partial match found to key: {key}")
+            return key
+    return None
+
+def fallback_specialist(symptoms, diagnosis):
+    """Specialist without Gemini: the same shortcuts as the Gemini path, then the keyword rules"""
     if not symptoms and not diagnosis:
         return "Cardiologist" # Default if no info (using Cardiologist as fallback since no General Physician)
-
-    # If very common symptoms that don't indicate anything specific, use a common specialist
     if symptoms and all(s.lower() in ["fever", "headache", "cold", "cough", "sore throat", "fatigue"] for s in symptoms):
         if not diagnosis or diagnosis.lower() in ["common cold", "flu", "viral infection"]:
             print("Common cold/flu symptoms detected, recommending Pulmonologist")
             return "Pulmonologist" # Since we don't have General Physician
+    return rule_based_specialist_determination(symptoms, diagnosis)
 
-    if not GEMINI_API_KEY:
-        print("Gemini API Key not available. Using rule-based specialist determination instead.")
-        return rule_based_specialist_determination(symptoms, diagnosis)
-        
-    available_specialists = list(SPECIALIST_KEYWORDS.keys())
-    
-    try:
-        symptoms_str = "\n".join([f"• {s}" for s in symptoms])
-        # Construct the description of categories for the prompt
-        category_descriptions = "\n".join([f"- {spec}: Associated with { ', '.join(keywords[:4]) }..." for spec, keywords in SPECIALIST_KEYWORDS.items()])
+specialist_scorer = None
 
-        prompt = f"""Analyze the following patient information:
-Patient Symptoms:
-{symptoms_str}
-
-Patient Diagnosis (if available): {diagnosis if diagnosis else "Not yet determined"}
-
-Consider these specialist categories and their typical focus areas:
-{category_descriptions}
-
-Based *only* on the patient's symptoms and diagnosis provided, which *single specialist category* from the list [{ ', '.join(available_specialists) }] best describes the medical area needing attention?
-
-Important guidelines:
-1. Choose the most specific specialist that directly relates to the main symptoms
-2. For general symptoms like fever, headache, fatigue ONLY, default to Pulmonologist
-3. For respiratory symptoms like cough, sore throat, nasal congestion, consider ENT Specialist or Pulmonologist depending on severity
-4. Only recommend Cardiologist for clear heart/chest/cardiac issues
-5. For abdominal issues, prefer Gastroenterologist
-6. For skin issues, always prefer Dermatologist
-7. For bone/joint issues, prefer Orthopedic Surgeon
-
-Return *only* the category name (e.g., "Neurologist", "Pulmonologist", "Cardiologist") exactly as written in the list. No explanation.
-"""
-        
-        generation_config = {
-            "temperature": 0.1, # Lower temperature for more consistent recommendations
-            "top_p": 0.95,
-            "top_k": 3,
-            "max_output_tokens": 50,
-        }
-        
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
-            generation_config=generation_config
-        )
-        
-        response = model.generate_content(prompt)
-        # Clean the response - remove potential quotes or markdown
-        recommended_type = response.text.strip().replace("'", "").replace("\"", "").replace("`", "")
-        
-        # Validate the response is one of the available types (dictionary keys)
-        if recommended_type in SPECIALIST_KEYWORDS:
-            print(f"Gemini classified symptoms under specialist: {recommended_type}")
-            return recommended_type
-        else:
-            print(f"Gemini returned an invalid specialist type key: '{recommended_type}'. Attempting fallback match.")
-            # More robust fallback matching
-            for key in SPECIALIST_KEYWORDS:
-                # Try to find the closest match
-                if key.lower() == recommended_type.lower():
-                    print(f"Exact case-insensitive match to: {key}")
-                    return key
-                elif key.lower() in recommended_type.lower() or recommended_type.lower() in key.lower():
-                    print(f"Partial match found to key: {key}")
-                    return key
-            
-            # If no match found, use rule-based determination
-            print("No matching specialist found from Gemini's response, using rule-based determination.")
-            return rule_based_specialist_determination(symptoms, diagnosis)
-            
-    except Exception as e:
-        print(f"Error getting specialist recommendation from Gemini: {e}. Using rule-based fallback.")
-        traceback.print_exc()
-        return rule_based_specialist_determination(symptoms, diagnosis)
+def rank_specialists(symptoms, diagnosis=""):
+    """All specialists that match, best first, as (specialist, score, symptom matches, diagnosis hits)"""
+    global specialist_scorer
+    if specialist_scorer is None:
+        specialist_scorer = SpecialistScorer(SPECIALIST_KEYWORDS)
+    return specialist_scorer.rank(symptoms, diagnosis or "")
 
 def rule_based_specialist_determination(symptoms, diagnosis):
     """Simple rule-based specialist determination as fallback"""
@@ -790,22 +847,13 @@ def rule_based_specialist_determination(symptoms, diagnosis):
     lower_symptoms = [s.lower() for s in symptoms]
     lower_diagnosis = diagnosis.lower() if diagnosis else ""
     
-    # Check for keywords in symptoms and diagnosis
-    for specialist, keywords in SPECIALIST_KEYWORDS.items():
-        # Check diagnosis first (higher priority)
-        if lower_diagnosis:
-            for keyword in keywords:
-                if keyword in lower_diagnosis:
-                    print(f"Rule-based match by diagnosis '{lower_diagnosis}' to {specialist}")
-                    return specialist
-        
-        # Then check symptoms
-        matches = 0
-        for symptom in lower_symptoms:
-            for keyword in keywords:
-                if keyword in symptom or symptom in keyword:
-                    matches += 1
-                    break  # Move to next symptom once a match is found
+    # Score every specialist at once; a keyword in the diagnosis has the higher priority
+    ranked = rank_specialists(lower_symptoms, lower_diagnosis)
+    if ranked:
+        specialist, _, matches, diagnosis_hits = ranked[0]
+        if diagnosis_hits:
+            print(f"Rule-based match by diagnosis '{lower_diagnosis}' to {specialist}")
+            return specialist
         
         # If more than half of symptoms match, return this specialist
         if matches >= max(1, len(lower_symptoms) // 2):
@@ -823,95 +871,214 @@ def rule_based_specialist_determination(symptoms, diagnosis):
     print("No rule-based match found, defaulting to Cardiologist")
     return "Cardiologist"
 
-def get_refined_recommendations_with_gemini(symptoms, diagnosis):
-    """Use Gemini to reformat and enhance the existing recommendations from DocBot, not to generate new ones."""
-    if not diagnosis or diagnosis.lower() == "unknown":
-        return ["Consult with a healthcare professional for specific recommendations."] # Default if no diagnosis
+# One Gemini call for everything the demographic panel needs: formatted symptoms,
+# recommendations and the specialist
+ENRICHMENT_PROMPT = """Given these raw patient symptoms extracted from conversation: {symptoms}
+A separate medical model has already diagnosed the patient with: {diagnosis}
 
-    if not GEMINI_API_KEY:
-        print("Gemini API Key not available. Skipping refinement of recommendations.")
-        return [] # Return empty if Gemini is not available
-        
-    try:
-        symptoms_str = "\n".join([f"• {s}" for s in symptoms])
-        prompt = f"""You are NOT acting as a medical assistant. You are ONLY formatting and enhancing the presentation of recommendations for a {diagnosis} based on the following symptoms. Do NOT generate new medical advice or diagnoses - only reformat and structure information.
-
-Symptoms:
-{symptoms_str}
-
-Context: A separate medical model has already diagnosed the patient with: {diagnosis}
-
-Please ONLY FORMAT these typical recommendations for {diagnosis} with improved structure and clarity:
-1. Format OTC medications with clear NAME and BASIC DOSAGE - use the format "Medication Name: dosage information"
-2. Ensure practical lifestyle advice is clear and actionable
-3. Include brief warning signs for seeking medical attention
-
-IMPORTANT: 
-- You are NOT providing medical advice, only formatting it
-- Keep each point extremely concise, maximum 1-2 lines
-- DO NOT use asterisks or any special formatting
-- No preamble or conclusion, just the formatted bullet points
-- Keep total output to 2-3 brief recommendations only
-- Avoid phrases like "This is not a prescription" or "Follow package instructions"
-- Your role is ONLY to make the existing recommendations clearer and more structured
+Return ONLY a JSON object, with no markdown and no explanation, with exactly these keys:
+"formatted_symptoms": the symptoms as a list of strings formatted as "Common name (Medical term)", for example "Fever (Pyrexia)". If there is no specific medical term, just use the common name.
+"recommendations": {recommendations_instruction}
+"specialist": the single specialist category from [{specialists}] that best describes the medical area needing attention.
+
+Specialist categories and their typical focus areas:
+{categories}
+
+Specialist guidelines:
+1. Choose the most specific specialist that directly relates to the main symptoms
+2. For general symptoms like fever, headache, fatigue ONLY, default to Pulmonologist
+3. For respiratory symptoms like cough, sore throat, nasal congestion, consider ENT Specialist or Pulmonologist depending on severity
+4. Only recommend Cardiologist for clear heart/chest/cardiac issues
+5. For abdominal issues, prefer Gastroenterologist
+6. For skin issues, always prefer Dermatologist
+7. For bone/joint issues, prefer Orthopedic Surgeon
 """
-        
-        generation_config = {
-            "temperature": 0.3, # Lower temperature for more consistent formatting
-            "top_p": 0.95,
-            "top_k": 0,
-            "max_output_tokens": 200, # Shorter limit to force conciseness
-        }
-        
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
-            generation_config=generation_config
-        )
-        
-        response = model.generate_content(prompt)
-        recommendations_text = response.text.strip()
-        
-        # Extract bullet points from the response
-        recommendations = []
-        for line in recommendations_text.split('\n'):
-            line = line.strip()
-            if line.startswith('•'):
-                clean_point = line.lstrip('• ').strip()
-                if clean_point:
-                    # Look for medication names and format consistently, removing any asterisks
-                    clean_point = clean_point.replace("*", "")
-                    medication_match = re.search(r'([A-Za-z\s\(\)]+):\s+(.+)', clean_point)
-                    if medication_match:
-                        med_name = medication_match.group(1).strip()
-                        dosage_info = medication_match.group(2).strip()
-                        # Format consistently for the GUI to parse properly and remove prescription disclaimers
-                        dosage_info = re.sub(r'this is not a prescription[^.]*\.', '', dosage_info, flags=re.IGNORECASE).strip()
-                        dosage_info = re.sub(r'follow package instructions[^.]*\.', '', dosage_info, flags=re.IGNORECASE).strip()
-                        recommendations.append(f"{med_name}: {dosage_info}")
-                    else:
-                        recommendations.append(clean_point)
-            elif line: # Capture lines even without bullet if Gemini misses formatting
-                if len(line) > 10: # Basic filter for meaningful lines
-                    # Remove any asterisks and disclaimers
-                    clean_line = line.replace("*", "")
-                    clean_line = re.sub(r'this is not a prescription[^.]*\.', '', clean_line, flags=re.IGNORECASE).strip()
-                    clean_line = re.sub(r'follow package instructions[^.]*\.', '', clean_line, flags=re.IGNORECASE).strip()
-                    recommendations.append(clean_line)
-        
-        # Limit to 3 most important recommendations
-        recommendations = recommendations[:3]
-        
-        if recommendations:
-             print(f"Gemini refined formatting of recommendations (concise): {recommendations}")
-             return recommendations
+RECOMMENDATIONS_INSTRUCTION = """a list of 2-3 brief strings that ONLY format the typical recommendations for the diagnosis, each 1-2 lines: OTC medications as "Medication Name: dosage information", clear lifestyle advice, and brief warning signs for seeking medical attention. You are NOT providing medical advice, only formatting it. No asterisks and no phrases like "This is not a prescription" or "Follow package instructions"."""
+
+def parse_enrichment_response(text):
+    """Pull the JSON object out of Gemini's reply, tolerating code fences around it"""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def clean_string_list(value, limit=None):
+    """Validate a JSON list of strings, dropping bullets, asterisks and prescription disclaimers"""
+    if not isinstance(value, list):
+        return []
+    cleaned = []
+    for item in value:
+        if not isinstance(item, str):
+            continue
+        item = item.replace("*", "").strip().lstrip("•-").strip()
+        item = strip_disclaimers(item)
+        if item and item not in cleaned:
+            cleaned.append(item)
+    return cleaned[:limit] if limit else cleaned
+
+def validate_enrichment(data, symptoms, wants_recommendations):
+    """The cleaned fields of a Gemini enrichment, or None unless every requested field is valid"""
+    if not isinstance(data, dict):
+        return None
+    formatted_symptoms = clean_string_list(data.get("formatted_symptoms"))
+    refined = clean_string_list(data.get("recommendations"), limit=3) if wants_recommendations else []
+    specialist = match_specialist(data.get("specialist"))
+    if (symptoms and not formatted_symptoms) or (wants_recommendations and not refined) or not specialist:
+        return None
+    return {
+        "formatted_symptoms": formatted_symptoms,
+        "recommendations": refined,
+        "specialist": specialist,
+    }
+
+def enrich_with_gemini(symptoms, diagnosis, recommendations=True):
+    """Format symptoms, recommendations and the specialist with a single Gemini call.
+
+    Returns a dict with formatted_symptoms, recommendations and specialist. Each
+    field that Gemini leaves out or gets wrong falls back on its own: basic
+    symptom formatting, no recommendations (the caller keeps what it extracted
+    from the chat) and the rule-based specialist. With recommendations=False
+    they are not asked for. Only responses whose fields all validate are
+    cached, so a bad response is retried next time.
+    """
+    has_diagnosis = bool(diagnosis) and diagnosis.lower() not in ("unknown", "insufficient symptom information")
+    wants_recommendations = recommendations and has_diagnosis
+    data = {}
+    cache_key = symptom_cache_key("enrichment" if recommendations else "enrichment-without-recommendations", symptoms, diagnosis)
+    if GEMINI_API_KEY and (symptoms or has_diagnosis):
+        data = validate_enrichment(enrichment_cache.get(cache_key), symptoms, wants_recommendations) or {}
+    if data:
+        print("Using cached Gemini enrichment.")
+    elif GEMINI_API_KEY and (symptoms or has_diagnosis):
+        try:
+            prompt = ENRICHMENT_PROMPT.format(
+                symptoms=", ".join(symptoms) if symptoms else "None reported",
+                diagnosis=diagnosis if has_diagnosis else "Not yet determined",
+                recommendations_instruction=RECOMMENDATIONS_INSTRUCTION if wants_recommendations else "an empty list",
+                specialists=", ".join(SPECIALIST_KEYWORDS),
+                categories="\n".join([f"- {spec}: Associated with { ', '.join(keywords[:4]) }..." for spec, keywords in SPECIALIST_KEYWORDS.items()])
+            )
+            generation_config = {
+                "temperature": 0.2,
+                "top_p": 0.95,
+                "top_k": 0,
+                "max_output_tokens": 1024,
+            }
+            response = generate_with_timeout(prompt, generation_config)
+            data = parse_enrichment_response(response.text)
+            validated = validate_enrichment(data, symptoms, wants_recommendations)
+            if validated:
+                enrichment_cache.put(cache_key, validated)
+            elif data:
+                print("Gemini enrichment is missing or malforming fields, using fallbacks for those.")
+            else:
+                print("Gemini enrichment did not return a JSON object, using fallbacks.")
+        except Exception as e:
+            print(f"Error enriching demographics with Gemini: {e}. Using fallbacks.")
+            traceback.print_exc()
+    elif not GEMINI_API_KEY:
+        print("Gemini API Key not available. Using basic formatting and rule-based specialist.")
+
+    formatted_symptoms = clean_string_list(data.get("formatted_symptoms"))
+    if not formatted_symptoms:
+        formatted_symptoms = basic_symptom_formatting(symptoms)
+    refined = clean_string_list(data.get("recommendations"), limit=3) if wants_recommendations else []
+    specialist = match_specialist(data.get("specialist")) or fallback_specialist(symptoms, diagnosis)
+    return {
+        "formatted_symptoms": formatted_symptoms,
+        "recommendations": refined,
+        "specialist": specialist,
+    }
+
+def simplify_symptoms(symptoms):
+    """Convert symptom strings to just the common names (without medical terms in parentheses)"""
+    simplified_symptoms = []
+    for symptom in symptoms:
+        # Extract just the common name if in format "Common name (Medical term)"
+        if "(" in symptom and ")" in symptom:
+            simplified_symptoms.append(symptom.split("(")[0].strip().lower())
         else:
-             print("Gemini did not return formatted recommendations in the expected structure.")
-             return [] # Return empty list if parsing fails
+            simplified_symptoms.append(symptom.lower())
+    return simplified_symptoms
 
-    except Exception as e:
-        print(f"Error refining recommendations with Gemini: {e}")
-        traceback.print_exc()
-        return [] # Return empty list on error
+class DiagnosisIndex:
+    """Precomputed lookups for scoring MEDICAL_DATA conditions against symptoms.
+
+    A symptom scores 2 for each condition whose name contains it, plus, for
+    every specialist whose keyword list contains the symptom, 1 per keyword of
+    that list found in the condition name. The keyword part is precomputed as
+    keyword -> {condition: weight} and the name part is one substring search
+    over all condition names joined together, so scoring only touches the
+    conditions a symptom can actually score.
+    """
+
+    def __init__(self, medical_data, specialist_keywords):
+        self.conditions = [(name, data["diagnosis"]) for name, data in medical_data.items() if "diagnosis" in data]
+        names = [name.lower() for name, _ in self.conditions]
+        self.names = "\0".join(names)
+        self.starts = []
+        offset = 0
+        for name in names:
+            self.starts.append(offset)
+            offset += len(name) + 1
+
+        self.keyword_weights = {}
+        for keywords in specialist_keywords.values():
+            hits = {}
+            for index, name in enumerate(names):
+                count = sum(1 for keyword in keywords if keyword in name)
+                if count:
+                    hits[index] = count
+            for keyword in set(keywords):
+                weights = self.keyword_weights.setdefault(keyword, {})
+                for index, count in hits.items():
+                    weights[index] = weights.get(index, 0) + count
+
+    def name_matches(self, symptom):
+        """Indexes of the conditions whose name contains the symptom"""
+        if not symptom:
+            return range(len(self.conditions))
+        found = []
+        position = self.names.find(symptom)
+        while position != -1:
+            index = bisect.bisect_right(self.starts, position) - 1
+            found.append(index)
+            if index + 1 == len(self.starts):
+                break
+            position = self.names.find(symptom, self.starts[index + 1])
+        return found
+
+    def rank(self, symptoms, k=3):
+        """Top k (condition, diagnosis, score); ties keep MEDICAL_DATA order"""
+        scores = {}
+        for symptom in symptoms:
+            for index in self.name_matches(symptom):
+                scores[index] = scores.get(index, 0) + 2  # Higher weight for symptom in condition name
+            for index, weight in self.keyword_weights.get(symptom, {}).items():
+                scores[index] = scores.get(index, 0) + weight
+        top = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.conditions[index][0], self.conditions[index][1], score) for index, score in top]
+
+diagnosis_index = None
+
+def get_diagnosis_index():
+    """Build the index on first use"""
+    global diagnosis_index
+    if diagnosis_index is None:
+        diagnosis_index = DiagnosisIndex(get_medical_data(), SPECIALIST_KEYWORDS)
+    return diagnosis_index
+
+def differential_from_rag(symptoms, k=3):
+    """The k best-scoring distinct diagnoses with their scores, for showing a differential"""
+    differential = []
+    for _, diagnosis, score in get_diagnosis_index().rank(simplify_symptoms(symptoms), k * 2):
+        if score > 1 and all(entry["diagnosis"] != diagnosis for entry in differential):
+            differential.append({"diagnosis": diagnosis, "score": score})
+    return differential[:k]
 
 def get_precise_diagnosis_from_rag(symptoms):
     """Get a precise diagnosis name from the simplified RAG system based on symptoms."""
@@ -919,15 +1086,7 @@ def get_precise_diagnosis_from_rag(symptoms):
         return "Insufficient symptom information"
     
     try:
-        # Convert symptom strings to just the common names (without medical terms in parentheses)
-        simplified_symptoms = []
-        for symptom in symptoms:
-            # Extract just the common name if in format "Common name (Medical term)"
-            if "(" in symptom and ")" in symptom:
-                common_name = symptom.split("(")[0].strip().lower()
-                simplified_symptoms.append(common_name)
-            else:
-                simplified_symptoms.append(symptom.lower())
+        simplified_symptoms = simplify_symptoms(symptoms)
         
         # Try to find a matching symptom combination first
         if len(simplified_symptoms) >= 2:
@@ -935,37 +1094,12 @@ def get_precise_diagnosis_from_rag(symptoms):
             if combination_match and "diagnosis" in combination_match:
                 return combination_match["diagnosis"]
         
-        # If no combination match, check individual conditions
-        best_match = None
-        best_match_score = 0
-        
-        for condition, condition_data in MEDICAL_DATA.items():
-            # Skip if no diagnosis info
-            if "diagnosis" not in condition_data:
-                continue
-                
-            # Check how many symptoms match this condition
-            score = 0
-            condition_lower = condition.lower()
-            
-            for symptom in simplified_symptoms:
-                if symptom in condition_lower:
-                    score += 2  # Higher weight for symptom in condition name
-                
-                # Check if symptom is in specialties keywords
-                for specialist, keywords in SPECIALIST_KEYWORDS.items():
-                    if symptom in keywords:
-                        for keyword in keywords:
-                            if keyword in condition_lower:
-                                score += 1
-            
-            if score > best_match_score:
-                best_match_score = score
-                best_match = condition_data["diagnosis"]
+        # If no combination match, score individual conditions through the index
+        ranked = get_diagnosis_index().rank(simplified_symptoms, k=1)
         
         # Return the best match if found, otherwise a general diagnosis
-        if best_match and best_match_score > 1:
-            return best_match
+        if ranked and ranked[0][2] > 1:
+            return ranked[0][1]
         
         # Default diagnoses based on common symptom patterns
         if "fever" in simplified_symptoms and "headache" in simplified_symptoms:
@@ -993,12 +1127,12 @@ if __name__ == "__main__":
         with open("Data/demographic.json", "w", encoding="utf-8") as f:
             json.dump({"symptoms": [], "diagnosis": "", "recommendations": [], "avoid": [], "follow_up": "", "recommended_specialist_type": "General Physician"}, f, indent=4)
             
-    # Example test with Gemini formatting
+    # Example test with Gemini enrichment
     # test_symptoms_raw = ['i have a bad cough', 'feeling hot', 'temp is 101', 'runny nose too']
-    # formatted_symptoms = format_symptoms_with_gemini(test_symptoms_raw)
-    # print("\n--- Gemini Formatting Test ---")
+    # enrichment = enrich_with_gemini(test_symptoms_raw, "Common Cold")
+    # print("\n--- Gemini Enrichment Test ---")
     # print(f"Raw: {test_symptoms_raw}")
-    # print(f"Formatted: {formatted_symptoms}")
+    # print(f"Formatted: {enrichment['formatted_symptoms']}")
     # print("----------------------------\n")
 
     Query = input("User: ")
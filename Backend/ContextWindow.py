@@ -0,0 +1,114 @@
+"""
+Token-budgeted context window for ChatBot history.
+
+The system prompt and the latest turns are always sent. Older turns are
+replaced by a rolling summary that is extended incrementally and cached, so a
+long consultation no longer grows the prompt (and time-to-first-token)
+without bound.
+"""
+
+import math
+import re
+from dotenv import dotenv_values
+
+env_vars = dotenv_values(".env")
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def count_tokens(text):
+    """Approximate a BPE tokenizer: one token per ~4 characters of each word, one per symbol"""
+    if not isinstance(text, str):
+        # Multimodal content: count the text parts only
+        text = " ".join(part.get("text", "") for part in text if isinstance(part, dict))
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in TOKEN_PATTERN.findall(text))
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + 4  # role and separators
+
+def summarize_message(message, max_chars=200):
+    """One line per message: user statements in full (they carry the symptoms), replies by their first sentence"""
+    content = " ".join(message["content"].split())
+    if message["role"] == "assistant":
+        content = SENTENCE_END.split(content, 1)[0]
+    if len(content) > max_chars:
+        content = content[:max_chars].rsplit(" ", 1)[0] + "..."
+    speaker = "Patient" if message["role"] == "user" else "DocBot"
+    return f"{speaker}: {content}"
+
+class ContextWindow:
+    def __init__(self, budget=3000, keep_turns=3, summary_budget=400):
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.summary_budget = summary_budget
+        self.summary_lines = []
+        self.summarized = 0  # number of leading messages covered by summary_lines
+        self.first_message = None
+        self.last_stats = {}
+
+    def split_recent(self, messages):
+        """Index where the latest keep_turns turns (each starting at a user message) begin"""
+        turns = 0
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index]["role"] == "user":
+                turns += 1
+                if turns == self.keep_turns:
+                    return index
+        return 0
+
+    def summary(self, older):
+        """Rolling summary of `older`, reusing the lines already built for its prefix"""
+        if len(older) < self.summarized or (older and older[0] != self.first_message):
+            # History was reset or rewritten; start over
+            self.summary_lines, self.summarized = [], 0
+        self.first_message = older[0] if older else None
+        for message in older[self.summarized:]:
+            line = summarize_message(message)
+            self.summary_lines.append((message["role"], line, count_tokens(line) + 1))
+        self.summarized = len(older)
+
+        # Over budget, drop the oldest DocBot lines first; patient lines carry the symptoms
+        lines = list(self.summary_lines)
+        used = sum(tokens for _, _, tokens in lines)
+        while lines and used > self.summary_budget:
+            index = next((i for i, (role, _, _) in enumerate(lines) if role == "assistant"), 0)
+            used -= lines.pop(index)[2]
+        return "\n".join(line for _, line, _ in lines)
+
+    def build(self, system_prompt, messages):
+        """Return the message list to send for `messages` (oldest first, latest last)"""
+        full = [{"role": "system", "content": system_prompt}] + [
+            {"role": m["role"], "content": m["content"]} for m in messages
+        ]
+        full_tokens = sum(message_tokens(m) for m in full)
+
+        if full_tokens <= self.budget:
+            prompt = full
+        else:
+            start = self.split_recent(messages)
+            recent = [{"role": m["role"], "content": m["content"]} for m in messages[start:]]
+            # If the latest turns alone overflow, drop the oldest of them but keep the final message
+            fixed = message_tokens(full[0]) + self.summary_budget
+            while len(recent) > 1 and fixed + sum(message_tokens(m) for m in recent) > self.budget:
+                recent.pop(0)
+                start += 1
+            prompt = [full[0]]
+            summary = self.summary(messages[:start]) if start else ""
+            if summary:
+                prompt.append({"role": "system", "content": "Summary of the earlier consultation:\n" + summary})
+            prompt += recent
+
+        used_tokens = sum(message_tokens(m) for m in prompt)
+        self.last_stats = {
+            "full_tokens": full_tokens,
+            "prompt_tokens": used_tokens,
+            "saved_tokens": full_tokens - used_tokens,
+        }
+        if self.last_stats["saved_tokens"] > 0:
+            print(f"Context window: {used_tokens} prompt tokens, saved {self.last_stats['saved_tokens']} of {full_tokens}")
+        return prompt
+
+context_window = ContextWindow(
+    budget=int(env_vars.get("ContextTokenBudget") or 3000),
+    keep_turns=int(env_vars.get("ContextKeepTurns") or 3)
+)
@@ -1,9 +1,22 @@
 import cohere
 from rich import print
+import json
+import math
+import os
+import random
+import re
 import time
+from collections import OrderedDict, deque
+from dotenv import dotenv_values
 
 co = cohere.ClientV2("1t6dVGVJBcDYPn3ai4brm5G5K7aFWvxuBZ9M0CVG")
 
+env_vars = dotenv_values(".env")
+# Local decisions below this confidence fall through to Cohere
+DECISION_CONFIDENCE = float(env_vars.get("DecisionConfidence") or 0.85)
+DECISION_LOG_PATH = os.path.join("Data", "DecisionLog.jsonl")
+DECISION_CACHE_PATH = os.path.join("Data", "DecisionCache.json")
+
 preamble = """
 You are a Decision-Making Model for an AI Doctor. Decide whether a query is a symptom description or requires image analysis.
 -> Respond with 'symptom (query)' for text/voice-based symptom descriptions (e.g., 'I have a cough' -> 'symptom I have a cough').
@@ -13,25 +26,342 @@ You are a Decision-Making Model for an AI Doctor. Decide whether a query is a sy
 -> Respond with 'symptom (query)' for any unclear or unclassified query.
 """
 
-def FirstLayerDMM(prompt: str = "test"):
+# Compiled keyword rules that settle a decision without any model.
+# Checked in order; the first match wins. The farewell rule matches the whole
+# utterance, since exiting ends the session ("quit smoking last year" or "see
+# you tomorrow doctor" are not goodbyes). A goodbye anywhere else in the
+# utterance ("I feel much better now, goodbye") is left to Cohere rather than
+# settled as a symptom. Image requests are not settled here: an upload goes
+# straight to vision.
+DECISION_RULES = [
+    ("exit", re.compile(r"^\W*(?:(?:ok(?:ay)?|alright|thanks?|thank you)\W+)*(?:bye|goodbye|good bye|bye bye|see you|see ya)(?:\W+(?:doctor|doc|thanks?|thank you))?\W*$", re.IGNORECASE)),
+    ("exit", re.compile(r"\b(?:end|stop|close) (?:the|this|our) (?:conversation|consultation|chat|session)\b", re.IGNORECASE)),
+    ("symptom", re.compile(r"\b(?:hi|hello|hey) doctor\b.*\b(?:fever|cough|cold|headache|pain|nausea|sore throat|runny nose|congestion)\b", re.IGNORECASE)),
+    ("symptom", re.compile(r"\b(?:i have|i've got|i am having|i'm having|i feel|i am feeling|i'm feeling|i've been having|i have been|suffering from|my \w+ (?:hurts|aches|is (?:swollen|itchy|red|sore)))\b", re.IGNORECASE)),
+    ("symptom", re.compile(r"\b(?:fever|cough|headache|migraine|nausea|vomiting|diarrh?oea|dizz(?:y|iness)|rash|itch(?:y|ing)?|sore throat|runny nose|congestion|fatigue|chills|pain|ache|swelling|bleeding)\b", re.IGNORECASE)),
+]
+FAREWELL = re.compile(r"\b(?:bye|goodbye|good bye|see you|see ya)\b", re.IGNORECASE)
+
+def tokenize(text):
+    words = re.findall(r"[a-z']+", text.lower())
+    features = [f"w:{w}" for w in words]
+    features += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    return features
+
+class DecisionModel:
+    """Tiny multinomial logistic regression over bag-of-words features.
+
+    Pure Python with sparse weights; trained from the decisions Cohere made
+    in earlier sessions (Data/DecisionLog.jsonl).
+    """
+
+    labels = ("symptom", "vision", "exit")
+
+    def __init__(self):
+        self.weights = {label: {} for label in self.labels}
+        self.bias = {label: 0.0 for label in self.labels}
+        self.trained_on = 0
+
+    def probabilities(self, text):
+        return self.probabilities_from_features(tokenize(text))
+
+    def predict(self, text):
+        probs = self.probabilities(text)
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+    def train(self, examples, epochs=20, learning_rate=0.5, l2=1e-4):
+        """Fit with stochastic gradient descent on (text, label) pairs"""
+        examples = [(tokenize(text), label) for text, label in examples if label in self.labels]
+        for _ in range(epochs):
+            for features, label in examples:
+                probs = self.probabilities_from_features(features)
+                for candidate in self.labels:
+                    gradient = probs[candidate] - (1.0 if candidate == label else 0.0)
+                    weights = self.weights[candidate]
+                    for f in features:
+                        weights[f] = weights.get(f, 0.0) * (1 - l2) - learning_rate * gradient
+                    self.bias[candidate] -= learning_rate * gradient
+        self.trained_on = len(examples)
+
+    def probabilities_from_features(self, features):
+        scores = {
+            label: self.bias[label] + sum(self.weights[label].get(f, 0.0) for f in features)
+            for label in self.labels
+        }
+        top = max(scores.values())
+        exps = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(exps.values())
+        return {label: value / total for label, value in exps.items()}
+
+def load_logged_decisions(path=DECISION_LOG_PATH):
+    examples = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    examples.append((entry["query"], entry["decision"]))
+                except (ValueError, KeyError):
+                    continue
+    return examples
+
+def log_decision(prompt, parts, path=DECISION_LOG_PATH):
+    """Append a Cohere decision so the local model can learn from it"""
+    if not parts:
+        return
+    label = parts[0].split(" ", 1)[0]
+    if label not in DecisionModel.labels:
+        return
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"query": prompt, "decision": label}) + "\n")
+    except OSError as e:
+        print(f"Error logging decision: {e}")
+
+decision_model = DecisionModel()
+MIN_TRAINING_EXAMPLES = 30
+RETRAIN_EVERY = 25
+logged_since_training = 0
+
+def train_decision_model():
+    global logged_since_training
+    examples = load_logged_decisions()
+    if len(examples) >= MIN_TRAINING_EXAMPLES:
+        model = DecisionModel()
+        model.train(examples)
+        decision_model.weights, decision_model.bias = model.weights, model.bias
+        decision_model.trained_on = model.trained_on
+    logged_since_training = 0
+
+def normalize_query(prompt):
+    """Lowercase, drop punctuation and collapse whitespace so near-identical queries share a key"""
+    return " ".join(re.sub(r"[^\w\s]", " ", prompt.lower()).split())
+
+class DecisionCache:
+    """LRU + TTL memo of Cohere decisions keyed by the normalized query.
+
+    Only the decision label is stored; it is re-attached to the caller's exact
+    query on a hit. When a path is given the cache is loaded from and saved to
+    a JSON file so it survives restarts.
+    """
+
+    def __init__(self, max_size=512, ttl=7 * 24 * 3600, path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()  # key -> (label, stored_at), least recent first
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def get(self, prompt):
+        key = normalize_query(prompt)
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, prompt, label):
+        key = normalize_query(prompt)
+        if not key:
+            return
+        self.entries[key] = (label, time.time())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        self.save()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            now = time.time()
+            for key, label, stored_at in stored:
+                if now - stored_at <= self.ttl:
+                    self.entries[key] = (label, stored_at)
+        except (OSError, ValueError) as e:
+            print(f"Error loading decision cache: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([[key, label, stored_at] for key, (label, stored_at) in self.entries.items()], f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving decision cache: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+        }
+
+decision_cache = DecisionCache(
+    max_size=int(env_vars.get("DecisionCacheSize") or 512),
+    path=DECISION_CACHE_PATH if (env_vars.get("DecisionCachePersist") or "true").lower() == "true" else None
+)
+
+def format_decision(label, prompt):
+    return ["exit"] if label == "exit" else [f"{label} {prompt}"]
+
+def LocalDecision(prompt):
+    """Classify without a network call; returns None when not confident enough"""
+    farewell = FAREWELL.search(prompt)
+    for label, pattern in DECISION_RULES:
+        if pattern.search(prompt):
+            if farewell and label != "exit":
+                return None
+            return format_decision(label, prompt)
+    if farewell:
+        return None
+    if decision_model.trained_on:
+        label, confidence = decision_model.predict(prompt)
+        # Without an uploaded image a vision decision would get no reply, so let Cohere settle it
+        if label != "vision" and confidence >= DECISION_CONFIDENCE:
+            return format_decision(label, prompt)
+    return None
+
+train_decision_model()
+
+class RetryPolicy:
+    """Capped attempts with exponential backoff, full jitter and an overall deadline"""
+
+    def __init__(self, max_attempts=3, base_delay=0.25, max_delay=2.0, deadline=10.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt):
+        """Delay before the next attempt, after `attempt` attempts have failed"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def run(self, call, on_attempt=None):
+        """Call `call(timeout)` until it returns a non-None result.
+
+        timeout is the time left before the deadline, so the caller can bound
+        the request itself and a hung attempt cannot overrun the deadline.
+        Returns None when attempts or the deadline run out. on_attempt receives
+        (attempt, seconds, outcome) after every attempt.
+        """
+        started = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            remaining = self.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            attempt_started = time.monotonic()
+            try:
+                result = call(remaining)
+                outcome = "ok" if result is not None else "invalid"
+            except Exception as e:
+                print(f"Decision attempt {attempt} failed: {e}")
+                result, outcome = None, "error"
+            if on_attempt:
+                on_attempt(attempt, time.monotonic() - attempt_started, outcome)
+            if result is not None:
+                return result
+            if attempt == self.max_attempts:
+                break
+            delay = self.backoff(attempt)
+            if time.monotonic() - started + delay >= self.deadline:
+                break
+            time.sleep(delay)
+        return None
+
+decision_retry_policy = RetryPolicy(
+    max_attempts=int(env_vars.get("DecisionMaxAttempts") or 3),
+    deadline=float(env_vars.get("DecisionDeadline") or 10.0)
+)
+
+# Most recent Cohere attempts as (attempt number, seconds, outcome)
+decision_attempts = deque(maxlen=1000)
+
+def record_attempt(attempt, seconds, outcome):
+    decision_attempts.append((attempt, seconds, outcome))
+
+def decision_metrics():
+    """Latency summary of recent Cohere attempts, including retries"""
+    latencies = sorted(seconds for _, seconds, _ in decision_attempts)
+    if not latencies:
+        return {"attempts": 0}
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    return {
+        "attempts": len(latencies),
+        "retries": sum(1 for attempt, _, _ in decision_attempts if attempt > 1),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": latencies[-1],
+    }
+
+def query_cohere(prompt, timeout=None):
+    """One Cohere round trip, bounded by timeout seconds; returns the decision parts or None if the reply is unusable"""
     conversation = [{"role": "system", "content": preamble}, {"role": "user", "content": prompt}]
     stream = co.chat_stream(
         model='command-r-plus',
         messages=conversation,
-        temperature=0.7
+        temperature=0.7,
+        request_options={"timeout_in_seconds": timeout} if timeout else None
     )
     response = ""
+    started = time.monotonic()
     for event in stream:
+        # The client timeout bounds each read; this bounds the whole stream
+        if timeout and time.monotonic() - started > timeout:
+            raise TimeoutError("Cohere stream exceeded the decision deadline")
         if event.type == "content-delta":
             response += event.delta.message.content.text
     response = response.replace("\n", " ").strip()
     parts = [part.strip() for part in response.split(",") if part.strip()]
-    if "(query)" in response:
-        time.sleep(0.5)
-        return FirstLayerDMM(prompt=prompt)
+    if "(query)" in response or not parts:
+        return None
+    return parts
+
+METRICS_EVERY = int(env_vars.get("DecisionMetricsEvery") or 10)
+cohere_calls = 0
+
+def log_decision_metrics():
+    """Print the Cohere latency summary and the decision cache counters"""
+    print(f"Decision metrics: {decision_metrics()} cache: {decision_cache.stats()}")
+
+def FirstLayerDMM(prompt: str = "test"):
+    global logged_since_training, cohere_calls
+    local = LocalDecision(prompt)
+    if local:
+        return local
+    cached = decision_cache.get(prompt)
+    if cached:
+        return format_decision(cached, prompt)
+    parts = decision_retry_policy.run(lambda timeout: query_cohere(prompt, timeout), on_attempt=record_attempt)
+    cohere_calls += 1
+    if cohere_calls % METRICS_EVERY == 0:
+        log_decision_metrics()
+    if parts is None:
+        print("Decision retries exhausted, defaulting to symptom handling")
+        return format_decision("symptom", prompt)
+    log_decision(prompt, parts)
+    if parts[0].split(" ", 1)[0] in DecisionModel.labels:
+        decision_cache.put(prompt, parts[0].split(" ", 1)[0])
+    logged_since_training += 1
+    if logged_since_training >= RETRAIN_EVERY:
+        train_decision_model()
     return parts
 
 if __name__ == "__main__":
     while True:
         user_input = input(">>> ")
-        print(FirstLayerDMM(user_input))
\ No newline at end of file
+        print(FirstLayerDMM(user_input))
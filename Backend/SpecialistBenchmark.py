@@ -0,0 +1,74 @@
+"""
+Benchmark for Backend/SpecialistScoring.py against the nested substring loops
+rule_based_specialist_determination used before, on synthetic keyword tables.
+
+The loop version is timed scoring every specialist (what a ranking needs); the
+scores of both versions are checked to agree before timing.
+
+Usage: python -m Backend.SpecialistBenchmark [keywords_per_specialist] [repeats]
+"""
+
+import random
+import string
+import sys
+import time
+from Backend.SpecialistScoring import SpecialistScorer, np
+
+SYMPTOMS = ["fever", "persistent cough", "sore throat", "chest pain", "nausea", "joint pain", "blurry vision"]
+DIAGNOSIS = "acute bronchitis with wheezing"
+
+def synthetic_keywords(specialists, per_specialist, seed=11):
+    rng = random.Random(seed)
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+    table = {f"Specialist {i}": [" ".join(word() for _ in range(rng.randint(1, 3))) for _ in range(per_specialist)]
+             for i in range(specialists)}
+    # Plant the benchmark symptoms so there is something to find
+    for i, term in enumerate(SYMPTOMS + ["bronchitis", "wheezing"]):
+        table[f"Specialist {i % specialists}"].append(term)
+    return table
+
+def loop_scores(table, symptoms, diagnosis):
+    """The previous nested loops, run for every specialist"""
+    matches, diagnosis_hits = [], []
+    for keywords in table.values():
+        diagnosis_hits.append(sum(1 for keyword in keywords if keyword in diagnosis))
+        count = 0
+        for symptom in symptoms:
+            for keyword in keywords:
+                if keyword in symptom or symptom in keyword:
+                    count += 1
+                    break
+        matches.append(count)
+    return matches, diagnosis_hits
+
+def best_time(call, repeats, inner=20):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(inner):
+            call()
+        best = min(best, (time.perf_counter() - start) / inner)
+    return best * 1e6
+
+if __name__ == "__main__":
+    per_specialist = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    table = synthetic_keywords(20, per_specialist)
+    keywords = sum(len(keywords) for keywords in table.values())
+
+    scorers = {"pure Python": SpecialistScorer(table, use_numpy=False)}
+    if np is not None:
+        scorers["NumPy"] = SpecialistScorer(table)
+    expected = loop_scores(table, SYMPTOMS, DIAGNOSIS)
+    for name, scorer in scorers.items():
+        assert tuple(scorer.scores(SYMPTOMS, DIAGNOSIS)) == expected, f"{name} scores differ from the loops"
+
+    print(f"{len(table)} specialists, {keywords} keywords, {len(SYMPTOMS)} symptoms, best of {repeats}")
+    loops = best_time(lambda: loop_scores(table, SYMPTOMS, DIAGNOSIS), repeats)
+    print(f"  nested loops:      {loops:10.1f} us")
+    for name, scorer in scorers.items():
+        elapsed = best_time(lambda: scorer.rank(SYMPTOMS, DIAGNOSIS), repeats)
+        print(f"  scorer ({name}): {elapsed:10.1f} us ({loops / elapsed:.0f}x)")
+    if np is None:
+        print("  NumPy not installed, matrix products use the sparse pure-Python path")
@@ -0,0 +1,113 @@
+"""
+Specialist scoring as a keyword-by-specialist incidence matrix.
+
+Symptoms and the diagnosis are encoded as keyword vectors. A symptom hits a
+keyword when either one contains the other, and the diagnosis hits the
+keywords it contains. One product with the incidence matrix then scores every
+specialist at once. The result is a ranking that does not depend on the order
+of the keyword table.
+
+Encoding a string uses two trigram indexes, one for the keywords it contains
+and one for the keywords containing it, so its cost barely grows with the
+number of keywords. NumPy is used for the matrix products when it is
+installed; without it the same products are computed from the sparse column
+lists.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class SpecialistScorer:
+    def __init__(self, specialist_keywords, use_numpy=True):
+        self.specialists = list(specialist_keywords)
+        self.keywords = []
+        self.columns = {}  # keyword -> column index
+        self.column_specialists = []  # column -> indexes of the specialists listing it
+        for row, keywords in enumerate(specialist_keywords.values()):
+            for keyword in keywords:
+                if keyword not in self.columns:
+                    self.columns[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    self.column_specialists.append([])
+                if row not in self.column_specialists[self.columns[keyword]]:
+                    self.column_specialists[self.columns[keyword]].append(row)
+
+        # First trigram -> columns, to find the keywords a text contains (shorter keywords are tested directly)
+        self.prefixes = {}
+        self.short_columns = []
+        # Trigram -> columns of the keywords containing it, to find the keywords that contain a symptom
+        self.trigrams = {}
+        for column, keyword in enumerate(self.keywords):
+            if len(keyword) < 3:
+                self.short_columns.append(column)
+            else:
+                self.prefixes.setdefault(keyword[:3], []).append(column)
+            for start in range(len(keyword) - 2):
+                self.trigrams.setdefault(keyword[start:start + 3], set()).add(column)
+
+        self.matrix = None
+        if use_numpy and np is not None:
+            self.matrix = np.zeros((len(self.keywords), len(self.specialists)), dtype=np.int32)
+            for column, rows in enumerate(self.column_specialists):
+                self.matrix[column, rows] = 1
+
+    def contained_keywords(self, text):
+        """Columns of the keywords that occur in text"""
+        found = {column for column in self.short_columns if self.keywords[column] in text}
+        for start in range(len(text) - 2):
+            for column in self.prefixes.get(text[start:start + 3], ()):
+                if text.startswith(self.keywords[column], start):
+                    found.add(column)
+        return found
+
+    def containing_keywords(self, text):
+        """Columns of the keywords that contain text"""
+        if len(text) < 3:
+            return {column for column, keyword in enumerate(self.keywords) if text in keyword}
+        postings = sorted((self.trigrams.get(text[start:start + 3], set()) for start in range(len(text) - 2)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {column for column in candidates if text in self.keywords[column]}
+
+    def encode_symptom(self, symptom):
+        return self.contained_keywords(symptom) | self.containing_keywords(symptom)
+
+    def scores(self, symptoms, diagnosis=""):
+        """Per specialist: (number of symptoms it matches, number of its keywords in the diagnosis)"""
+        symptom_columns = [self.encode_symptom(symptom.lower()) for symptom in symptoms]
+        diagnosis_columns = self.contained_keywords(diagnosis.lower()) if diagnosis else set()
+
+        if self.matrix is not None:
+            encoded = np.zeros((len(symptom_columns) + 1, len(self.keywords)), dtype=np.int32)
+            for row, columns in enumerate(symptom_columns):
+                encoded[row, list(columns)] = 1
+            encoded[-1, list(diagnosis_columns)] = 1
+            hits = encoded @ self.matrix
+            return (hits[:-1] > 0).sum(axis=0).tolist(), hits[-1].tolist()
+
+        matches = [0] * len(self.specialists)
+        for columns in symptom_columns:
+            for row in {row for column in columns for row in self.column_specialists[column]}:
+                matches[row] += 1
+        diagnosis_hits = [0] * len(self.specialists)
+        for column in diagnosis_columns:
+            for row in self.column_specialists[column]:
+                diagnosis_hits[row] += 1
+        return matches, diagnosis_hits
+
+    def rank(self, symptoms, diagnosis=""):
+        """Specialists with a positive score, best first, as (specialist, score, matches, diagnosis_hits).
+
+        A keyword found in the diagnosis outweighs every symptom match; ties keep
+        the order of the keyword table.
+        """
+        matches, diagnosis_hits = self.scores(symptoms, diagnosis)
+        weight = len(symptoms) + 1
+        ranked = [
+            (self.specialists[row], matches[row] + weight * diagnosis_hits[row], matches[row], diagnosis_hits[row])
+            for row in range(len(self.specialists))
+            if matches[row] or diagnosis_hits[row]
+        ]
+        ranked.sort(key=lambda entry: -entry[1])
+        return ranked
@@ -6,6 +6,7 @@ from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import dotenv_values
 import os
 import mtranslate as mt
+from Frontend.EventBus import bus, StatusChanged
 
 env_vars = dotenv_values(".env")
 InputLanguage = env_vars.get("InputLanguage")
@@ -62,11 +63,8 @@ chrome_options.add_argument("--headless-new")
 service = Service(ChromeDriverManager().install())
 driver = webdriver.Chrome(service=service, options=chrome_options)
 
-TempDirPath = rf"{current_dir}/Frontend/Files"
-
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}/Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(StatusChanged(Status))
 
 def QueryModifier(Query):
     new_query = Query.lower().strip()
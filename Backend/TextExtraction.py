@@ -0,0 +1,214 @@
+"""
+Compiled pattern bank for the regex extraction in Backend/Chatbot.py.
+
+Every pattern is compiled once at import instead of being looked up in the re
+module's cache on each call. The answer cleanup keeps one pass per pattern:
+merging the asterisk and header substitutions into one alternation measured
+slower. Pattern lists whose matches may overlap (symptoms, recommendations,
+avoid, follow-up) stay separate lists: merging them would change what is
+extracted.
+"""
+
+import re
+
+def compile_all(patterns, flags=0):
+    return [re.compile(pattern, flags) for pattern in patterns]
+
+# Pattern matching for symptoms
+SYMPTOM_PATTERNS = compile_all([
+    r'(pain|ache|discomfort) (in|on) (?:my|the) ([a-z\s]+)',  # pain in my abdomen
+    r'([a-z\s]+) (pain|ache|discomfort)',  # abdominal pain
+    r'(?:I have|I\'m having|experiencing|having|with) ([a-z\s]+)',  # I have fever
+    r'(dark|cloudy|pink|red|clear) (urine|pee|urination)',  # dark urine
+    r'(difficulty|trouble|problem) (with|in) ([a-z\s]+)',  # difficulty in breathing
+    r'(fever|cough|headache|nausea|vomiting|dizziness|fatigue|cold|sore throat|runny nose|congestion|chills)',  # direct symptoms - added more terms
+    r'(?:my|the) ([a-z\s]+) (?:is|are) ([a-z\s]+)',  # my urine is pink
+    r'(?:been having|suffering from|troubled with) ([a-z\s]+)',  # been having fever
+    r'(?:since|for) (?:last|past|about)? ?(\d+) (days?|weeks?|months?)', # time-based context for symptoms
+])
+SYMPTOM_PREFIX = re.compile(r'i have |i\'m having |experiencing |having |with ')
+GREETING_SYMPTOMS = re.compile(r'(?:i am|i\'m) having ([^\.]+)')
+SYMPTOM_LIST_SPLIT = re.compile(r',|\sand\s')
+QUERY_AFTER_INSTRUCTIONS = re.compile(r'real doctor would\.\s*(.*?)$', re.DOTALL)
+
+# Words whose presence anywhere in the conversation implies an extra symptom
+SYMPTOM_KEYWORDS = ("urine", "urination", "pink", "dark", "pain", "abdomen")
+
+# Sections of DocBot's reply
+RECOMMENDATION_PATTERNS = compile_all([
+    r"Recommendations?:?\s*(.*?)(?:Avoid|Follow-up|When to see|$)",
+    r"(?:I recommend|You should|It's advisable to|Consider)\s+([^\.]+)",
+    r"Treatment(?:\s+includes|\s+options)?:?\s*(.*?)(?:Avoid|Follow-up|When to see|$)"
+], re.DOTALL | re.IGNORECASE)
+AVOID_PATTERNS = compile_all([
+    r"Avoid:?\s*(.*?)(?:Follow-up|When to see|$)",
+    r"(?:Don't|Do not|Avoid|Stay away from|Limit)\s+([^\.]+)",
+    r"It's best to avoid\s+([^\.]+)"
+], re.DOTALL | re.IGNORECASE)
+FOLLOW_UP_PATTERNS = compile_all([
+    r"Follow-up:?\s*(.*?)(?:$)",
+    r"(?:See|Consult|Visit) (?:a|your) doctor\s+([^\.]+)",
+    r"If symptoms (?:persist|worsen|continue)\s+([^\.]+)"
+], re.DOTALL | re.IGNORECASE)
+BULLET_POINT = re.compile(r"[-•]([^-•]+)")
+SENTENCE_END = re.compile(r'\.(?=\s|$)')
+
+# Answer and Gemini output cleanup
+ASTERISKS = re.compile(r'\*+')
+MARKDOWN_HEADER = re.compile(r'#+\s+')
+BULLET_DASH = re.compile(r'\n\s*-\s+')
+DISCLAIMER = re.compile(r'(?:this is not a prescription|follow package instructions)[^.]*\.', re.IGNORECASE)
+CACHE_KEY_JUNK = re.compile(r"[^\w\s()/'-]")
+
+def clean_answer(answer):
+    """Remove all asterisks and markdown headers, and standardize bullet points"""
+    answer = ASTERISKS.sub('', answer.strip())
+    answer = MARKDOWN_HEADER.sub('', answer)
+    return BULLET_DASH.sub('\n- ', answer)
+
+def strip_disclaimers(text):
+    return DISCLAIMER.sub('', text).strip()
+
+def extract_points(patterns, text):
+    """Collect the bullet points (or, without bullets, the sentences) of every section a pattern finds"""
+    points = []
+    for pattern in patterns:
+        for match in pattern.finditer(text):
+            if match.groups():
+                section = match.group(1).strip()
+                # Split by bullet points or new lines with dashes
+                bullet_points = BULLET_POINT.findall(section)
+                if bullet_points:
+                    for point in bullet_points:
+                        point = point.strip()
+                        if point and point not in points and len(point) > 5:
+                            points.append(point.capitalize())
+                else:
+                    # Try to split by sentences if no bullet points
+                    for sentence in SENTENCE_END.split(section):
+                        sentence = sentence.strip()
+                        if sentence and len(sentence) > 10:  # Avoid very short sentences
+                            points.append(sentence.capitalize())
+    return points
+
+def find_follow_up(text):
+    """First non-empty follow-up advice, trying the patterns in order"""
+    for pattern in FOLLOW_UP_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            follow_up = match.group(1).strip()
+            if follow_up:
+                return follow_up
+    return ""
+
+class SymptomTracker:
+    """Symptoms extracted so far from one session's chat.
+
+    update() only scans the user messages appended since the previous call and
+    merges their symptoms into a set, so the cost of a turn depends on the new
+    message rather than the whole conversation. The tracker starts over when
+    the history is reset or rewritten (a new session).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.processed = 0  # number of leading messages already scanned
+        self.first_message = None
+        self.first_message_found = False
+        self.symptoms = []  # cleaned symptoms in the order they were found
+        self.seen = set()
+        self.keywords = set()
+
+    def update(self, messages):
+        """Scan the messages added since the last call and return all symptoms so far"""
+        if len(messages) < self.processed or (messages and messages[0] != self.first_message):
+            self.reset()
+        self.first_message = messages[0] if messages else None
+        for msg in messages[self.processed:]:
+            if msg["role"] == "user":
+                self.scan(self.user_text(msg["content"]))
+        self.processed = len(messages)
+        return list(self.symptoms)
+
+    def user_text(self, content):
+        """Extract actual user input from prompt"""
+        user_text = ""
+        
+        # Special handling for first message - often has greeting with symptoms
+        if not self.first_message_found:
+            self.first_message_found = True
+            # Check for common first message pattern like "Hi doctor I am having fever and cough"
+            if "hi doctor" in content.lower() or "hello doctor" in content.lower():
+                # Try to extract symptoms from greeting-style first message
+                having_match = GREETING_SYMPTOMS.search(content.lower())
+                if having_match:
+                    symptom_text = having_match.group(1).strip()
+                    # Further process to split combined symptoms
+                    if "and" in symptom_text or "," in symptom_text:
+                        parts = SYMPTOM_LIST_SPLIT.split(symptom_text)
+                        for part in parts:
+                            specific_part = part.strip()
+                            if specific_part and len(specific_part) > 3:
+                                user_text += f"I have {specific_part}. "
+                    else:
+                        user_text += f"I have {symptom_text}. "
+        
+        # Try to find just the user's actual symptoms by removing system instructions
+        parts = content.split("Now, respond to the patient's latest query:")
+        if len(parts) > 1:
+            user_text += parts[1].strip() + " "
+        else:
+            # Find the actual query after the instructions
+            match = QUERY_AFTER_INSTRUCTIONS.search(content)
+            if match:
+                user_text += match.group(1).strip() + " "
+            elif "hi doctor" not in content.lower():
+                # If no special processing was done above, add content normally
+                user_text += content + " "
+        return user_text
+
+    def scan(self, user_text):
+        text = user_text.lower()
+        for pattern in SYMPTOM_PATTERNS:
+            for match in pattern.finditer(text):
+                if match.group():
+                    symptom = match.group().strip()
+                    # Clean up the symptom text
+                    symptom = SYMPTOM_PREFIX.sub('', symptom)
+                    # Format specific types of symptoms better
+                    if "pain in " in symptom:
+                        parts = symptom.split("pain in ")
+                        if len(parts) > 1:
+                            symptom = f"{parts[1].strip()} pain"
+                    self.add(symptom)
+        
+        # Do additional checks for specific symptoms
+        self.keywords.update(keyword for keyword in SYMPTOM_KEYWORDS if keyword in text)
+        if "urine" in self.keywords or "urination" in self.keywords:
+            if "pink" in self.keywords:
+                self.add("pink urine")
+            if "dark" in self.keywords:
+                self.add("dark urine")
+            if "pain" in self.keywords:
+                self.add("painful urination")
+        if "abdomen" in self.keywords and "pain" in self.keywords:
+            self.add("abdominal pain")
+
+    def add(self, symptom):
+        """Clean up a raw symptom and keep each resulting part once"""
+        clean_symptom = symptom.strip().lower()
+        
+        # Process compound symptoms like "fever and cough" or "fever, cough"
+        if " and " in clean_symptom:
+            parts = [part.strip() for part in clean_symptom.split(" and ")]
+        elif "," in clean_symptom:
+            parts = [part.strip() for part in clean_symptom.split(",")]
+        else:
+            parts = [clean_symptom] if clean_symptom else []
+            
+        for part in parts:
+            if part and (len(part) > 2 or part == clean_symptom) and part not in self.seen:
+                self.seen.add(part)
+                self.symptoms.append(part)
@@ -1,29 +1,168 @@
 import pygame
 import asyncio
 import edge_tts
+import hashlib
+import io
 import os
+import re
+from collections import OrderedDict
 from dotenv import dotenv_values
 
 env_vars = dotenv_values(".env")
 assistant_voice = env_vars.get("Assistantvoice")
+voice_pitch = '+5Hz'
+voice_rate = '+13%'
 
-async def text_to_audio_file(text):
-    file_path = r"Data\speech.mp3"
-    if os.path.exists(file_path):
-        os.remove(file_path)
-    communicate = edge_tts.Communicate(text, assistant_voice, pitch='+5Hz', rate='+13%')
-    await communicate.save(file_path)
+# A sentence ends at ., ! or ? followed by whitespace, or at a line break (bullet lists)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+class AudioCache:
+    """Content-addressed mp3 cache on disk with least-recently-used eviction.
+
+    Clips are stored as <sha256>.mp3 where the hash covers the text and every
+    voice setting, so changing the voice never serves stale audio. The total size
+    is kept under max_bytes by deleting the least recently used clips; recency
+    survives restarts through the file modification time.
+    """
+
+    def __init__(self, directory=os.path.join("Data", "tts_cache"), max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> size in bytes, least recent first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.load_index()
+
+    def load_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".mp3"):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+
+    def key(self, text, voice=None, pitch=voice_pitch, rate=voice_rate):
+        voice = voice or assistant_voice
+        return hashlib.sha256(f"{voice}\0{pitch}\0{rate}\0{text}".encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, text):
+        key = self.key(text)
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                audio = f.read()
+            os.utime(self.path(key))
+        except OSError:
+            self.discard(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return audio
+
+    def put(self, text, audio):
+        if not audio or len(audio) > self.max_bytes:
+            return
+        key = self.key(text)
+        tmp_path = self.path(key) + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, self.path(key))
+        except OSError as e:
+            print(f"Error writing TTS cache: {e}")
+            return
+        self.total_bytes -= self.entries.pop(key, 0)
+        self.entries[key] = len(audio)
+        self.total_bytes += len(audio)
+        while self.total_bytes > self.max_bytes and self.entries:
+            self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        self.total_bytes -= self.entries.pop(key, 0)
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+        }
+
+audio_cache = AudioCache(max_bytes=int(env_vars.get("TTSCacheMB") or 50) * 1024 * 1024)
+
+async def synthesize(text):
+    """Synthesize text with edge_tts and return the mp3 bytes, without touching the disk"""
+    communicate = edge_tts.Communicate(text, assistant_voice, pitch=voice_pitch, rate=voice_rate)
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
+
+async def text_to_audio(text):
+    """Return mp3 bytes for text, from the audio cache when possible"""
+    audio = audio_cache.get(text)
+    if audio is None:
+        audio = await synthesize(text)
+        audio_cache.put(text, audio)
+    return audio
+
+class PlaybackEngine:
+    """One pygame mixer kept open for the life of the process.
+
+    Audio is fed from memory buffers. The mixer has a single music channel, so
+    callers from concurrent sessions take turns through an asyncio lock instead
+    of clobbering each other's audio.
+    """
+
+    def __init__(self):
+        self.lock = None
+
+    def ensure_mixer(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+    async def play(self, audio, stop_func=lambda r=None: True):
+        """Play mp3 bytes to completion; returns False if stop_func interrupted it"""
+        self.ensure_mixer()
+        async with self.lock:
+            pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+            pygame.mixer.music.play()
+            try:
+                while pygame.mixer.music.get_busy():
+                    if not stop_func():
+                        return False
+                    await asyncio.sleep(0.01)
+                return True
+            finally:
+                pygame.mixer.music.stop()
+                pygame.mixer.music.unload()
+
+engine = PlaybackEngine()
 
 async def TTS(text, stop_func=lambda r=None: True):
     try:
-        await text_to_audio_file(text)
-        pygame.mixer.init()
-        pygame.mixer.music.load(r"Data\speech.mp3")
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            if not stop_func():
-                break
-            await asyncio.sleep(0.01)
+        audio = await text_to_audio(text)
+        await engine.play(audio, stop_func)
         return True
     except Exception as e:
         print(f"Error in TTS: {e}")
@@ -31,11 +170,98 @@ async def TTS(text, stop_func=lambda r=None: True):
     finally:
         try:
             stop_func(False)
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
         except Exception as e:
             print(f"Error in Finally Block: {e}")
 
+class SentenceSplitter:
+    """Collect streamed text and hand back complete sentences as they form"""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, delta):
+        self.buffer += delta
+        parts = SENTENCE_BOUNDARY.split(self.buffer)
+        # The last part may still be growing, keep it for the next delta
+        self.buffer = parts.pop()
+        return [clean_sentence(part) for part in parts if clean_sentence(part)]
+
+    def flush(self):
+        sentence = clean_sentence(self.buffer)
+        self.buffer = ""
+        return [sentence] if sentence else []
+
+def clean_sentence(text):
+    """Drop markdown the model may stream before the final answer cleanup"""
+    text = re.sub(r'\*+', '', text)
+    text = re.sub(r'#+\s+', '', text)
+    return text.strip().lstrip('-').strip()
+
+class SpeechPipeline:
+    """Speak sentences in order while synthesizing the next one during playback.
+
+    say() queues a sentence without blocking. One task synthesizes sentences with
+    edge_tts into memory, another plays the finished clips in order on the shared
+    engine, so sentence N+1 is synthesized while sentence N is playing. finish()
+    waits until everything queued has been spoken.
+    """
+
+    def __init__(self, stop_func=lambda r=None: True):
+        self.stop_func = stop_func
+        self.sentences = asyncio.Queue()
+        self.clips = asyncio.Queue()
+        self.stopped = False
+        self.synthesizer = None
+        self.player = None
+
+    def start(self):
+        if self.synthesizer is None:
+            self.synthesizer = asyncio.ensure_future(self.synthesize())
+            self.player = asyncio.ensure_future(self.play())
+
+    def say(self, sentence):
+        self.start()
+        self.sentences.put_nowait(sentence)
+
+    async def synthesize(self):
+        while True:
+            sentence = await self.sentences.get()
+            if sentence is None or self.stopped:
+                await self.clips.put(None)
+                return
+            try:
+                await self.clips.put(await text_to_audio(sentence))
+            except Exception as e:
+                print(f"Error synthesizing sentence: {e}")
+
+    async def play(self):
+        while True:
+            audio = await self.clips.get()
+            if audio is None:
+                return
+            try:
+                if not self.stopped and not await engine.play(audio, self.stop_func):
+                    self.stopped = True
+            except Exception as e:
+                print(f"Error playing sentence: {e}")
+
+    async def finish(self):
+        """Wait for every queued sentence to be spoken"""
+        if self.synthesizer is None:
+            return True
+        self.sentences.put_nowait(None)
+        try:
+            await asyncio.gather(self.synthesizer, self.player)
+            return not self.stopped
+        except Exception as e:
+            print(f"Error in TTS pipeline: {e}")
+            return False
+        finally:
+            try:
+                self.stop_func(False)
+            except Exception as e:
+                print(f"Error in Finally Block: {e}")
+
 if __name__ == "__main__":
     async def test_tts():
         text = input("Enter the text: ")
@@ -0,0 +1,119 @@
+"""
+In-process event bus between the AsyncWorker thread and the GUI.
+
+Every event is published through a Qt signal, so handlers that are methods
+of widgets run on the GUI thread even when the worker thread publishes.
+The bus also keeps the latest value of each piece of shared state (status,
+mic, pending text, screen text, diagnosis) so a widget built after an event
+was published can still pick it up, and so the worker can read state
+without touching the filesystem.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from PyQt5.QtCore import QObject, pyqtSignal
+
+@dataclass(frozen=True)
+class StatusChanged:
+    status: str
+
+@dataclass(frozen=True)
+class MicrophoneToggled:
+    active: bool
+
+@dataclass(frozen=True)
+class TextSubmitted:
+    text: str
+
+@dataclass(frozen=True)
+class ImageUploaded:
+    path: str
+
+@dataclass(frozen=True)
+class UserText:
+    text: str
+
+@dataclass(frozen=True)
+class AssistantDelta:
+    text: str
+
+@dataclass(frozen=True)
+class AssistantMessage:
+    text: str
+    streamed: bool = False  # True when it completes a run of AssistantDelta events
+
+@dataclass(frozen=True)
+class DiagnosisUpdated:
+    data: dict = field(default_factory=dict)
+
+class EventBus(QObject):
+    status_changed = pyqtSignal(object)
+    microphone_toggled = pyqtSignal(object)
+    text_submitted = pyqtSignal(object)
+    image_uploaded = pyqtSignal(object)
+    user_text = pyqtSignal(object)
+    assistant_delta = pyqtSignal(object)
+    assistant_message = pyqtSignal(object)
+    diagnosis_updated = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.status = ""
+        self.microphone_active = False
+        self.pending_text = ""
+        self.pending_image = ""
+        self.screen_text = ""
+        self.diagnosis = None
+        self._signals = {
+            StatusChanged: self.status_changed,
+            MicrophoneToggled: self.microphone_toggled,
+            TextSubmitted: self.text_submitted,
+            ImageUploaded: self.image_uploaded,
+            UserText: self.user_text,
+            AssistantDelta: self.assistant_delta,
+            AssistantMessage: self.assistant_message,
+            DiagnosisUpdated: self.diagnosis_updated,
+        }
+
+    def add_listener(self, callback):
+        """Register a plain callable that receives every event in the publishing thread"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def publish(self, event):
+        """Record the event in the shared state and deliver it to all subscribers"""
+        with self._lock:
+            if isinstance(event, StatusChanged):
+                self.status = event.status
+            elif isinstance(event, MicrophoneToggled):
+                self.microphone_active = event.active
+            elif isinstance(event, TextSubmitted):
+                self.pending_text = event.text
+            elif isinstance(event, ImageUploaded):
+                self.pending_image = event.path
+            elif isinstance(event, DiagnosisUpdated):
+                self.diagnosis = event.data
+            listeners = list(self._listeners)
+
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in event listener: {e}")
+
+        signal = self._signals.get(type(event))
+        if signal is not None:
+            signal.emit(event)
+
+    def set_screen_text(self, text):
+        with self._lock:
+            self.screen_text = text
+
+bus = EventBus()
@@ -8,12 +8,22 @@ from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QTextCharFormat, QFont,
 from PyQt5.QtCore import Qt, QSize, QTimer, QRect, QPoint
 from dotenv import dotenv_values
 from time import sleep
+from Frontend.EventBus import (
+    bus,
+    StatusChanged,
+    MicrophoneToggled,
+    TextSubmitted,
+    ImageUploaded,
+    UserText,
+    AssistantDelta,
+    AssistantMessage,
+    DiagnosisUpdated
+)
 
 env_vars = dotenv_values(".env")
 Assistantname = "DocBot"
 username = env_vars.get("Username", "User")
 current_dir = os.getcwd()
-old_chat_message = ""
 TempDirPath = rf"{current_dir}\Frontend\Files"
 GraphicsDirPath = rf"{current_dir}\Frontend\Graphics"
 
@@ -35,39 +45,68 @@ def QueryModifier(Query):
         new_query = new_query[:-1] + "." if query_words[-1][-1] in [".", "?", "!"] else new_query + "."
     return new_query.capitalize()
 
+# The Set/Get functions below are kept as a compatibility adapter over the
+# in-process event bus; they no longer touch the files in Frontend/Files.
 def SetMicrophoneStatus(Command):
-    with open(rf"{TempDirPath}\Mic.data", "w", encoding="utf-8") as file:
-        file.write(Command)
+    bus.publish(MicrophoneToggled(Command == "True"))
 
 def GetMicrophoneStatus():
-    with open(rf"{TempDirPath}\Mic.data", "r", encoding="utf-8") as file:
-        return file.read()
+    return "True" if bus.microphone_active else "False"
 
 def SetAssistantStatus(Status):
-    with open(rf"{TempDirPath}\Status.data", "w", encoding="utf-8") as file:
-        file.write(Status)
+    bus.publish(StatusChanged(Status))
 
 def GetAssistantStatus():
-    with open(rf"{TempDirPath}\Status.data", "r", encoding="utf-8") as file:
-        return file.read()
+    return bus.status
 
 def SetTextInput(text):
-    with open(rf"{TempDirPath}\TextInput.data", "w", encoding="utf-8") as file:
-        file.write(text)
+    text = text.strip()
+    bus.publish(TextSubmitted("" if text == "None" else text))
 
 def GetTextInput():
-    with open(rf"{TempDirPath}\TextInput.data", "r", encoding="utf-8") as file:
-        text = file.read().strip()
-        if text and text != "None":
-            return text
+    text = bus.pending_text
+    if text and text != "None":
+        return text
+    return ""
+
+def SetImageUpload(path):
+    path = path.strip()
+    bus.publish(ImageUploaded("" if path == "None" else path))
+
+def GetImageUpload():
+    path = bus.pending_image
+    if path and path != "None":
+        return path
     return ""
 
 def GraphicsDictonaryPath(Filename):
     return rf"{GraphicsDirPath}\{Filename}"
 
+def ParseScreenText(Text):
+    """Turn a block of 'Name : message' lines into chat events"""
+    events = []
+    for line in Text.split("\n"):
+        if line.strip():
+            if line.startswith(f"{username} :"):
+                events.append(UserText(line.replace(f"{username} :", "").strip()))
+            elif line.startswith(f"{Assistantname} :"):
+                events.append(AssistantMessage(line.replace(f"{Assistantname} :", "").strip()))
+    return events
+
 def ShowTextToScreen(Text):
-    with open(rf"{TempDirPath}\Responses.data", "w", encoding="utf-8") as file:
-        file.write(Text)
+    bus.set_screen_text(Text)
+    for event in ParseScreenText(Text):
+        bus.publish(event)
+
+def ShowStreamingText(Delta):
+    bus.publish(AssistantDelta(Delta))
+
+def FinishStreamingText(Text):
+    bus.set_screen_text(f"{Assistantname} : {Text}")
+    bus.publish(AssistantMessage(Text, streamed=True))
+
+def ShowDiagnosis(data):
+    bus.publish(DiagnosisUpdated(data))
 
 class MessageBubble(QFrame):
     def __init__(self, message, is_user=False, parent=None):
@@ -96,7 +135,7 @@ class MessageBubble(QFrame):
         """)
         
         # Message text label
-        text_label = QLabel(self.message)
+        self.text_label = text_label = QLabel(self.message)
         text_label.setWordWrap(True)
         text_label.setStyleSheet("""
             color: white;
@@ -112,12 +151,8 @@ class MessageBubble(QFrame):
         
         # Make bubbles much wider to reduce wrapping
         bubble.setMaximumWidth(1200)  # Much wider maximum
-        
-        # Set a large minimum width to force horizontal spread
-        # Calculate min width based on message length but with a higher multiplier
-        # to encourage horizontal spread
-        min_width = max(400, min(len(self.message) * 15, 1000))
-        bubble.setMinimumWidth(min_width)
+        self.bubble = bubble
+        self.updateWidth()
         
         layout.addWidget(bubble)
         
@@ -127,6 +162,21 @@ class MessageBubble(QFrame):
         self.setStyleSheet("background: transparent;")
         self.setMaximumWidth(2000)  # Very large maximum width
 
+    def updateWidth(self):
+        # Set a large minimum width to force horizontal spread
+        # Calculate min width based on message length but with a higher multiplier
+        # to encourage horizontal spread
+        min_width = max(400, min(len(self.message) * 15, 1000))
+        self.bubble.setMinimumWidth(min_width)
+
+    def setText(self, message):
+        self.message = message
+        self.text_label.setText(message)
+        self.updateWidth()
+
+    def appendText(self, delta):
+        self.setText(self.message + delta)
+
 class ChatContainer(QScrollArea):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -196,7 +246,10 @@ class ChatContainer(QScrollArea):
         # Add stretch back at the bottom
         self.messages_layout.addStretch()
         
-        # Scroll to bottom
+        self.scrollToBottom()
+        return bubble
+
+    def scrollToBottom(self):
         self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
 
 class ChatSection(QWidget):
@@ -475,6 +528,29 @@ class ChatSection(QWidget):
         self.text_input.returnPressed.connect(self.submit_text)
         input_layout.addWidget(self.text_input)
         
+        # Image upload button: the image goes to the vision model with any typed text
+        self.image_button = QPushButton("Image")
+        self.image_button.setMinimumHeight(45)
+        self.image_button.setFixedWidth(80)
+        self.image_button.setStyleSheet("""
+            QPushButton {
+                background-color: #2b2b2b;
+                color: white;
+                border-radius: 22px;
+                padding: 5px 15px;
+                font-size: 14px;
+                border: 1px solid #4a90e2;
+            }
+            QPushButton:hover {
+                background-color: #333333;
+            }
+            QPushButton:pressed {
+                background-color: #1f1f1f;
+            }
+        """)
+        self.image_button.clicked.connect(self.upload_image)
+        input_layout.addWidget(self.image_button)
+        
         # --- Add Send Button --- 
         self.send_button = QPushButton("Send")
         self.send_button.setMinimumHeight(45)
@@ -664,11 +740,17 @@ class ChatSection(QWidget):
         
         layout.addWidget(status_container)
         
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.timeout.connect(self.updateDiagnosisPanel)
-        self.timer.start(1000)  # Update every 1 second instead of 5ms - this is more efficient
+        # Subscribe to the event bus instead of polling Frontend/Files
+        bus.user_text.connect(self.onUserText)
+        bus.assistant_delta.connect(self.onAssistantDelta)
+        bus.assistant_message.connect(self.onAssistantMessage)
+        bus.status_changed.connect(self.SpeechRecogText)
+        bus.diagnosis_updated.connect(self.onDiagnosisUpdated)
+        
+        # Replay whatever was published before this widget existed
+        self.loadMessages(bus.screen_text)
+        self.label.setText(bus.status)
+        self.updateDiagnosisPanel(bus.diagnosis)
 
     def update_mic_icon(self):
         icon_path = GraphicsDictonaryPath("Mic_on.png" if self.mic_toggled else "Mic_off.png")
@@ -680,28 +762,38 @@ class ChatSection(QWidget):
         self.update_mic_icon()
         SetMicrophoneStatus("False" if self.mic_toggled else "True")
 
-    def loadMessages(self):
-        global old_chat_message
-        with open(TempDictonaryPath("Responses.data"), "r", encoding="utf-8") as file:
-            messages = file.read()
-            if messages and messages != old_chat_message:
-                # Split messages into user and AI messages
-                lines = messages.split('\n')
-                for line in lines:
-                    if line.strip():
-                        if line.startswith(f"{username} :"):
-                            # User message
-                            message = line.replace(f"{username} :", "").strip()
-                            self.chat_container.addMessage(message, "user")
-                        elif line.startswith(f"{Assistantname} :"):
-                            # AI message
-                            message = line.replace(f"{Assistantname} :", "").strip()
-                            self.chat_container.addMessage(message, "ai")
-                old_chat_message = messages
-
-    def SpeechRecogText(self):
-        with open(TempDictonaryPath("Status.data"), "r", encoding="utf-8") as file:
-            self.label.setText(file.read())
+    def loadMessages(self, messages):
+        for event in ParseScreenText(messages):
+            if isinstance(event, UserText):
+                self.onUserText(event)
+            else:
+                self.onAssistantMessage(event)
+
+    def onUserText(self, event):
+        self.chat_container.addMessage(event.text, "user")
+
+    def onAssistantDelta(self, event):
+        # Grow the bubble of the answer being streamed, creating it on the first delta
+        if getattr(self, '_streaming_bubble', None) is None:
+            self._streaming_bubble = self.chat_container.addMessage(event.text, "ai")
+        else:
+            self._streaming_bubble.appendText(event.text)
+            self.chat_container.scrollToBottom()
+
+    def onAssistantMessage(self, event):
+        bubble = getattr(self, '_streaming_bubble', None)
+        if event.streamed and bubble is not None:
+            # Replace the raw streamed text with the cleaned final answer
+            bubble.setText(event.text)
+            self._streaming_bubble = None
+        else:
+            self.chat_container.addMessage(event.text, "ai")
+
+    def SpeechRecogText(self, event):
+        self.label.setText(event.status)
+
+    def onDiagnosisUpdated(self, event):
+        self.updateDiagnosisPanel(event.data)
 
     def submit_text(self):
         text = self.text_input.text().strip()
@@ -712,12 +804,20 @@ class ChatSection(QWidget):
             SetTextInput(text) # Send to backend
             self.text_input.clear()
 
-    def updateDiagnosisPanel(self):
-        """Update the diagnosis panel with information from demographic.json"""
+    def upload_image(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Upload Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.webp)")
+        if path:
+            self.chat_container.addMessage(f"[Image] {os.path.basename(path)}", "user")
+            SetImageUpload(path) # Publishes ImageUploaded, which wakes the worker
+
+    def updateDiagnosisPanel(self, data=None):
+        """Update the diagnosis panel with the latest demographic data"""
         try:
-            if os.path.exists("Data/demographic.json"):
+            if data is None and os.path.exists("Data/demographic.json"):
                 with open("Data/demographic.json", "r") as f:
                     data = json.load(f)
+            if data is not None:
+                self._diagnosis_data = data
                 
                 # Update symptoms - Display as bullet points (always in real-time)
                 symptoms_list = data.get("symptoms", [])
@@ -738,7 +838,12 @@ class ChatSection(QWidget):
                     
                     # Set diagnosis label to show just the condition name
                     self.diagnosis_label.setText(diagnosis.strip())
-                    
+
+                    # Other likely conditions from the RAG ranking, on hover
+                    differential = [entry["diagnosis"] for entry in data.get("differential", [])
+                                    if entry.get("diagnosis") != diagnosis.strip()]
+                    self.diagnosis_label.setToolTip("Also consider: " + ", ".join(differential) if differential else "")
+
                     # Check if this is a new/changed diagnosis - if so, update doctor recommendation
                     if diagnosis != previous_diagnosis and previous_diagnosis != "":
                         print(f"Final diagnosis changed from '{previous_diagnosis}' to '{diagnosis}'. Updating doctor recommendation.")
@@ -750,7 +855,7 @@ class ChatSection(QWidget):
                     self.diagnosis_label.setText("Pending diagnosis") # Default message when no diagnosis
                     self._previous_diagnosis = ""
 
-                self.update_recommend_btn_state()
+                self.update_recommend_btn_state(data)
 
                 # Update recommendations - Make them concise (2-3 lines)
                 recommendations_list = data.get("recommendations", [])
@@ -821,17 +926,16 @@ class ChatSection(QWidget):
             print(f"Error updating diagnosis panel: {e}")
             traceback.print_exc()
     
-    def update_recommend_btn_state(self):
+    def update_recommend_btn_state(self, data=None):
         """Enable/disable doctor recommendation button based on diagnosis"""
         try:
-            if os.path.exists("Data/demographic.json"):
-                with open("Data/demographic.json", "r") as f:
-                    data = json.load(f)
-                
-                if data.get("diagnosis") and data["diagnosis"].strip():
-                    self.recommend_doctor_btn.setEnabled(True)
-                else:
-                    self.recommend_doctor_btn.setEnabled(False)
+            if data is None:
+                data = getattr(self, '_diagnosis_data', None) or {}
+            
+            if data.get("diagnosis") and data["diagnosis"].strip():
+                self.recommend_doctor_btn.setEnabled(True)
+            else:
+                self.recommend_doctor_btn.setEnabled(False)
         except Exception as e:
             print(f"Error updating recommendation button state: {e}")
             self.recommend_doctor_btn.setEnabled(False)
@@ -839,9 +943,11 @@ class ChatSection(QWidget):
     def recommend_doctor(self):
         """Show doctor recommendation based on current diagnosis"""
         try:
-            # Get current diagnosis
-            with open("Data/demographic.json", "r") as f:
-                data = json.load(f)
+            # Get current diagnosis from the last DiagnosisUpdated event
+            data = getattr(self, '_diagnosis_data', None)
+            if data is None:
+                with open("Data/demographic.json", "r") as f:
+                    data = json.load(f)
             
             if not data.get("diagnosis"):
                 return
@@ -1112,13 +1218,11 @@ class InitialScreen(QWidget):
         self.setFixedHeight(screen_height)
         self.setFixedWidth(screen_width)
         self.setStyleSheet("background-color: black;")
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(5)
+        self.label.setText(bus.status)
+        bus.status_changed.connect(self.SpeechRecogText)
 
-    def SpeechRecogText(self):
-        with open(TempDictonaryPath("Status.data"), "r", encoding="utf-8") as file:
-            self.label.setText(file.read())
+    def SpeechRecogText(self, event):
+        self.label.setText(event.status)
 
     def toggle_icon(self, event=None):
         pixmap = QPixmap(GraphicsDictonaryPath("Mic_on.png" if self.toggled else "Mic_off.png"))
@@ -1310,10 +1414,8 @@ def GraphicalUserInterface():
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    with open(rf"{TempDirPath}\TextInput.data", "w") as f:
-        f.write("None")  # Initialize text input
-    with open(rf"{TempDirPath}\ImageUpload.data", "w") as f:
-        f.write("None")  # Initialize image upload
+    SetTextInput("None")  # Initialize text input
+    SetImageUpload("None")  # Initialize image upload
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
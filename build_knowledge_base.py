@@ -0,0 +1,62 @@
+"""
+Build script for the compiled medical knowledge base.
+
+Reads MEDICAL_DATA and SYMPTOM_COMBINATIONS from medical_knowledge.py,
+normalizes their whitespace (the info strings carry the source indentation)
+and writes them to Data/MedicalKnowledge.marshal, which the simplified RAG
+system loads lazily. run.py runs this when the file is missing or stale, and
+the RAG system writes it itself if it still finds it missing.
+
+Usage: python build_knowledge_base.py
+"""
+
+import marshal
+import os
+import re
+
+# Resolved from this file, so the app finds it whatever directory it is started from
+KNOWLEDGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "MedicalKnowledge.marshal")
+KNOWLEDGE_VERSION = 1
+
+def normalize_text(text):
+    """Collapse whitespace within lines, drop indentation and repeated blank lines"""
+    lines = [re.sub(r'\s+', ' ', line).strip() for line in text.strip().split("\n")]
+    return re.sub(r'\n{3,}', '\n\n', "\n".join(lines))
+
+def normalize(value):
+    """Apply normalize_text to every string in nested dicts, lists and tuples"""
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {normalize(key): normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(normalize(item) for item in value)
+    return value
+
+def compile_knowledge():
+    """MEDICAL_DATA and SYMPTOM_COMBINATIONS from medical_knowledge.py, normalized, in memory"""
+    import medical_knowledge
+
+    return {
+        "version": KNOWLEDGE_VERSION,
+        "medical_data": normalize(medical_knowledge.MEDICAL_DATA),
+        "symptom_combinations": normalize(medical_knowledge.SYMPTOM_COMBINATIONS),
+    }
+
+def write_knowledge(knowledge, path=KNOWLEDGE_PATH):
+    """Write compiled knowledge to path, replacing the old file atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        marshal.dump(knowledge, f)
+    os.replace(path + ".tmp", path)
+
+def build_knowledge_base(path=KNOWLEDGE_PATH):
+    """Compile medical_knowledge.py into path and return the compiled knowledge"""
+    knowledge = compile_knowledge()
+    write_knowledge(knowledge, path)
+    return knowledge
+
+if __name__ == "__main__":
+    knowledge = build_knowledge_base()
+    print(f"Wrote {len(knowledge['medical_data'])} conditions and "
+          f"{len(knowledge['symptom_combinations'])} symptom combinations to {KNOWLEDGE_PATH}")
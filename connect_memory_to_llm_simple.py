@@ -5,1264 +5,446 @@ instead of vector embeddings. This avoids TensorFlow dependencies.
 
 import os
 import json
+import heapq
+import math
 import re
+import marshal
+import threading
 from dotenv import load_dotenv, find_dotenv
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 load_dotenv(find_dotenv())
+from build_knowledge_base import KNOWLEDGE_PATH, KNOWLEDGE_VERSION, compile_knowledge, write_knowledge
 
-# Enhanced medical data with diagnoses included
-MEDICAL_DATA = {
-    "common cold": {
-        "info": """
-        Common Cold
-        
-        The common cold is a viral infection of the upper respiratory tract. Symptoms usually include runny nose, sneezing, sore throat, cough, congestion, body aches, and sometimes a mild fever.
-        
-        Treatment:
-        - Rest and stay hydrated
-        - Over-the-counter pain relievers like acetaminophen (Tylenol) or ibuprofen (Advil)
-        - Decongestants or antihistamines can help with symptoms
-        - Throat lozenges or salt water gargle for sore throat
-        
-        Avoid:
-        - Smoking and alcohol which can worsen symptoms
-        - Spreading the virus by washing hands regularly
-        
-        When to see a doctor:
-        - Fever above 101.3°F (38.5°C)
-        - Symptoms lasting more than 10 days
-        - Severe or unusual symptoms
-        """,
-        "diagnosis": "Common Cold",
-        "recommendations": [
-            "Taking over-the-counter decongestants can help relieve nasal congestion",
-            "Drinking hot tea with honey can soothe a sore throat"
-        ],
-        "avoid": [
-            "Smoking and alcohol which can worsen symptoms",
-            "Exposure to cold air which may irritate the throat"
-        ],
-        "follow_up": "If symptoms worsen after 7 days, consult a doctor"
-    },
-    
-    "fever": {
-        "info": """
-        Fever
-        
-        Fever is a temporary increase in body temperature, often due to illness. A temperature above 100.4°F (38°C) is considered a fever.
-        
-        Treatment:
-        - Rest and plenty of fluids
-        - Over-the-counter medications like acetaminophen or ibuprofen to reduce fever
-        - Light clothing and a comfortable room temperature
-        - Cool, damp washcloth on the forehead
-        
-        Avoid:
-        - Overdressing which can trap body heat
-        - Cold baths which can cause shivering and raise temperature
-        
-        When to see a doctor:
-        - Temperature above 103°F (39.4°C) in adults
-        - Fever lasting more than three days
-        - Fever with severe headache, rash, sensitivity to light, stiff neck
-        """,
-        "diagnosis": "Fever of Unknown Origin",
-        "recommendations": [
-            "Taking acetaminophen or ibuprofen can help reduce fever",
-            "Staying hydrated with plenty of fluids is essential"
-        ],
-        "avoid": [
-            "Overdressing which can trap body heat",
-            "Cold baths which can cause shivering and raise temperature"
-        ],
-        "follow_up": "If fever persists more than 3 days or exceeds 103°F, seek medical attention immediately"
-    },
-    
-    "headache": {
-        "info": """
-        Headache
-        
-        Headaches can be primary (not caused by another condition) or secondary (symptom of another condition). Tension headaches, migraines, and cluster headaches are common types.
-        
-        Treatment:
-        - Over-the-counter pain relievers
-        - Rest in a quiet, dark room
-        - Hot or cold compresses to the head or neck
-        - Massage and relaxation techniques
-        
-        Avoid:
-        - Triggers such as stress, certain foods, alcohol
-        - Irregular sleep patterns
-        - Skipping meals
-        
-        When to see a doctor:
-        - Severe or sudden-onset headache
-        - Headache with fever, stiff neck, confusion
-        - Headache after head injury
-        - Headache that worsens despite treatment
-        """,
-        "diagnosis": "Tension Headache",
-        "recommendations": [
-            "Over-the-counter pain relievers like ibuprofen can provide relief",
-            "Regular breaks from screen time to reduce eye strain"
-        ],
-        "avoid": [
-            "Known trigger foods such as aged cheese or processed meats",
-            "Skipping meals which can trigger headaches"
-        ],
-        "follow_up": "If headaches persist or worsen, consult with a neurologist"
-    },
-    
-    "sore throat": {
-        "info": """
-        Sore Throat
-        
-        A sore throat (pharyngitis) is pain, scratchiness or irritation of the throat that often worsens when swallowing. The most common cause is a viral infection or cold.
-        
-        Treatment:
-        - Gargle with warm salt water
-        - Drink warm liquids
-        - Throat lozenges or sprays
-        - Humidifier to moisten the air
-        - Over-the-counter pain relievers
-        
-        Avoid:
-        - Smoking and exposure to secondhand smoke
-        - Acidic or spicy foods
-        - Dry air
-        
-        When to see a doctor:
-        - Sore throat lasting longer than a week
-        - Difficulty swallowing or breathing
-        - Fever higher than 101°F (38.3°C)
-        - White patches on tonsils (may indicate strep throat)
-        """,
-        "diagnosis": "Viral Pharyngitis",
-        "recommendations": [
-            "Gargling with warm salt water every few hours",
-            "Drinking warm herbal tea with honey for soothing relief"
-        ],
-        "avoid": [
-            "Acidic or spicy foods that can irritate the throat",
-            "Dry air - consider using a humidifier"
-        ],
-        "follow_up": "If white patches appear on tonsils or fever develops, consult a doctor for possible strep throat"
-    },
-    
-    "cough": {
-        "info": """
-        Cough
-        
-        Coughing is a reflex that helps clear your airways of irritants. Coughs can be acute (lasting less than three weeks) or chronic (lasting more than eight weeks).
-        
-        Treatment:
-        - Stay hydrated to thin mucus
-        - Use cough drops or lozenges to soothe the throat
-        - Try honey (for adults and children over 1 year)
-        - Use a humidifier to add moisture to the air
-        - Over-the-counter cough suppressants for dry coughs
-        
-        Avoid:
-        - Smoking and exposure to irritants
-        - Dry air
-        - Lying flat, which can worsen coughing at night
-        
-        When to see a doctor:
-        - Cough lasting more than three weeks
-        - Coughing up blood or thick, discolored mucus
-        - Accompanied by high fever, shortness of breath, wheezing
-        """,
-        "diagnosis": "Acute Bronchitis",
-        "recommendations": [
-            "Using a humidifier to add moisture to the air",
-            "Taking honey (for adults) to soothe the throat and reduce coughing"
-        ],
-        "avoid": [
-            "Smoking and exposure to secondhand smoke",
-            "Lying flat immediately after eating which may worsen coughing at night"
-        ],
-        "follow_up": "If coughing persists beyond three weeks or produces colored phlegm, consult a doctor"
-    },
-    
-    "flu": {
-        "info": """
-        Influenza (Flu)
-        
-        Influenza is a contagious respiratory illness caused by influenza viruses. Symptoms include fever, cough, sore throat, body aches, fatigue, and sometimes vomiting and diarrhea.
-        
-        Treatment:
-        - Rest and stay hydrated
-        - Over-the-counter pain relievers for fever and aches
-        - Antiviral medications if prescribed early
-        - Use a humidifier to ease breathing
-        
-        Avoid:
-        - Contact with others to prevent spreading
-        - Alcohol and tobacco
-        - Strenuous activities until recovery
-        
-        When to see a doctor:
-        - Difficulty breathing or shortness of breath
-        - Persistent chest pain or pressure
-        - Confusion or inability to arouse
-        - Severe or persistent vomiting
-        """,
-        "diagnosis": "Influenza (Flu)",
-        "recommendations": [
-            "Taking ibuprofen can help reduce fever and pain",
-            "Rest and adequate hydration are essential for recovery"
-        ],
-        "avoid": [
-            "Having cold food and drinks",
-            "Contact with others to prevent spreading the virus"
-        ],
-        "follow_up": "If symptoms persist or worsen after a week, consult a doctor"
-    },
-    
-    "allergies": {
-        "info": """
-        Allergies
-        
-        Allergies occur when your immune system reacts to a foreign substance. Symptoms include sneezing, itching, runny nose, and watery eyes.
-        
-        Treatment:
-        - Over-the-counter antihistamines
-        - Nasal corticosteroids
-        - Decongestants for short-term relief
-        - Allergy shots (immunotherapy)
-        
-        Avoid:
-        - Known allergens (pollen, dust, pet dander)
-        - Outdoor activities during high pollen count
-        - Carpeting and upholstered furniture that collect allergens
-        
-        When to see a doctor:
-        - Symptoms persist despite treatment
-        - Allergic reactions interfere with daily activities
-        - Signs of asthma (wheezing, shortness of breath)
-        """,
-        "diagnosis": "Seasonal Allergic Rhinitis",
-        "recommendations": [
-            "Over-the-counter antihistamines can provide relief from symptoms",
-            "Using a HEPA filter in your bedroom can reduce allergen exposure"
-        ],
-        "avoid": [
-            "Outdoor activities during high pollen counts",
-            "Keeping windows open during allergy season"
-        ],
-        "follow_up": "If symptoms don't improve with over-the-counter medications, consult an allergist"
-    },
-    
-    "migraine": {
-        "info": """
-        Migraine
-        
-        Migraines are intense headaches that can cause throbbing pain, usually on one side of the head, often accompanied by nausea, vomiting, and sensitivity to light and sound.
-        
-        Treatment:
-        - Rest in a quiet, dark room
-        - Apply cold packs to the forehead
-        - Take migraine-specific medications (triptans)
-        - Over-the-counter pain relievers
-        
-        Avoid:
-        - Known triggers (certain foods, stress, bright lights)
-        - Skipping meals
-        - Irregular sleep patterns
-        - Excessive caffeine
-        
-        When to see a doctor:
-        - Severe headache that comes on suddenly
-        - Headache with fever, stiff neck, confusion, seizures
-        - Headache after a head injury
-        - Chronic headaches that worsen after coughing or exertion
-        """,
-        "diagnosis": "Migraine Headache",
-        "recommendations": [
-            "Resting in a quiet, dark room during attacks",
-            "Applying cold compresses to the forehead"
-        ],
-        "avoid": [
-            "Known trigger foods like chocolate, aged cheese, or red wine",
-            "Bright lights and loud noises during episodes"
-        ],
-        "follow_up": "Consider consulting a neurologist if migraines are frequent or debilitating"
-    },
-    
-    "pneumonia": {
-        "info": """
-        Pneumonia
-        
-        Pneumonia is an infection that inflames the air sacs in one or both lungs. The air sacs may fill with fluid or pus, causing cough with phlegm, fever, chills, and difficulty breathing.
-        
-        Treatment:
-        - Antibiotics if the cause is bacterial
-        - Antiviral medications if the cause is viral
-        - Pain relievers and fever reducers
-        - Cough medicine to help you rest
-        - Plenty of fluids to prevent dehydration
-        
-        Avoid:
-        - Smoking and secondhand smoke
-        - Exposure to people with respiratory infections
-        - Alcohol which can interfere with antibiotics
-        
-        When to seek emergency care:
-        - Difficulty breathing or shortness of breath
-        - Chest pain that worsens when you breathe or cough
-        - Persistent high fever greater than 102°F (39°C)
-        - Confusion or changes in mental awareness
-        """,
-        "diagnosis": "Pneumonia",
-        "recommendations": [
-            "Complete the full course of antibiotics if prescribed",
-            "Rest and stay hydrated to help your body recover"
-        ],
-        "avoid": [
-            "Smoking and exposure to secondhand smoke",
-            "Strenuous activity until fully recovered"
-        ],
-        "follow_up": "If symptoms worsen or don't improve with treatment, seek medical attention immediately"
-    },
-    
-    "heart attack": {
-        "info": """
-        Heart Attack (Myocardial Infarction)
-        
-        A heart attack occurs when blood flow to part of the heart is blocked, causing damage to heart muscle. Symptoms include chest pain or pressure, pain spreading to jaw/neck/back, nausea, shortness of breath, and cold sweat.
-        
-        Treatment:
-        - EMERGENCY MEDICAL CARE IS REQUIRED
-        - Aspirin to prevent further blood clotting
-        - Clot-busting medications or surgical procedures
-        - Various medications including blood thinners, beta blockers, ACE inhibitors
-        
-        Avoid:
-        - Delay in seeking medical attention
-        - Physical exertion until cleared by a doctor
-        - Smoking and secondhand smoke
-        
-        When to seek emergency care:
-        - ANY suspected heart attack symptoms - CALL 911 IMMEDIATELY
-        """,
-        "diagnosis": "Possible Heart Attack - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Call 911 or emergency services immediately",
-            "Take aspirin if available and not allergic"
-        ],
-        "avoid": [
-            "Delay in seeking emergency care",
-            "Physical exertion of any kind"
-        ],
-        "follow_up": "This is a life-threatening emergency requiring immediate hospital care"
-    },
-    
-    "stroke": {
-        "info": """
-        Stroke
-        
-        A stroke occurs when blood flow to part of the brain is blocked or when a blood vessel in the brain bursts. Brain tissue deprived of oxygen begins to die within minutes. Remember FAST: Face drooping, Arm weakness, Speech difficulty, Time to call 911.
-        
-        Treatment:
-        - EMERGENCY MEDICAL CARE IS REQUIRED
-        - Clot-busting medications if given within 3-4.5 hours
-        - Endovascular procedures to remove clot
-        - Surgery to stop bleeding for hemorrhagic stroke
-        
-        Avoid:
-        - Delay in seeking medical attention
-        - Taking medications before medical evaluation
-        
-        When to seek emergency care:
-        - ANY suspected stroke symptoms - CALL 911 IMMEDIATELY
-        """,
-        "diagnosis": "Possible Stroke - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Call 911 or emergency services immediately",
-            "Note the time symptoms began"
-        ],
-        "avoid": [
-            "Delay in seeking emergency care",
-            "Taking medications before medical evaluation"
-        ],
-        "follow_up": "This is a time-sensitive emergency requiring immediate hospital care"
-    },
-    
-    "appendicitis": {
-        "info": """
-        Appendicitis
-        
-        Appendicitis is inflammation of the appendix that can lead to rupture if untreated. Symptoms typically begin with pain near the navel that moves to the lower right abdomen, along with nausea, vomiting, and low-grade fever.
-        
-        Treatment:
-        - Surgery to remove the appendix (appendectomy)
-        - Antibiotics before and after surgery
-        - Pain medications
-        
-        Avoid:
-        - Laxatives or enemas which can cause rupture
-        - Pain medications before medical evaluation which can mask symptoms
-        - Food and drink which may worsen symptoms
-        
-        When to seek emergency care:
-        - Sudden pain that begins on the right side of the lower abdomen
-        - Pain that worsens if you cough, walk or make jarring movements
-        - Nausea and vomiting
-        - Loss of appetite
-        """,
-        "diagnosis": "Possible Appendicitis - REQUIRES MEDICAL ATTENTION",
-        "recommendations": [
-            "Seek immediate medical evaluation",
-            "Do not take pain medications before medical evaluation"
-        ],
-        "avoid": [
-            "Taking laxatives or using heating pads on the abdomen",
-            "Eating or drinking until evaluated by a doctor"
-        ],
-        "follow_up": "This condition may require emergency surgery"
-    },
-    
-    "meningitis": {
-        "info": """
-        Meningitis
-        
-        Meningitis is inflammation of the membranes surrounding the brain and spinal cord. Viral meningitis may improve without treatment, but bacterial meningitis is serious and can be life-threatening requiring immediate antibiotic treatment.
-        
-        Treatment:
-        - EMERGENCY MEDICAL CARE IS REQUIRED
-        - Antibiotics if bacterial
-        - Antiviral medications if viral
-        - Corticosteroids to reduce inflammation
-        - Anticonvulsants for seizures
-        
-        Avoid:
-        - Delay in seeking medical attention
-        - Taking medications that might mask symptoms
-        
-        When to seek emergency care:
-        - Sudden high fever
-        - Severe headache with stiff neck
-        - Confusion or difficulty concentrating
-        - Seizures
-        - Sensitivity to light
-        - Skin rash (especially non-blanching)
-        """,
-        "diagnosis": "Possible Meningitis - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Seek emergency medical care immediately",
-            "This is a potentially life-threatening condition"
-        ],
-        "avoid": [
-            "Any delay in seeking emergency care",
-            "Taking medications that might mask symptoms"
-        ],
-        "follow_up": "This requires immediate hospital evaluation and treatment"
-    },
-    
-    "asthma": {
-        "info": """
-        Asthma
-        
-        Asthma is a condition in which your airways narrow, swell and produce extra mucus, making breathing difficult and triggering coughing, wheezing and shortness of breath.
-        
-        Treatment:
-        - Quick-relief medications (rescue inhalers)
-        - Long-term control medications
-        - Breathing exercises
-        - Identifying and avoiding triggers
-        
-        Avoid:
-        - Known triggers such as allergens, smoke, pollution
-        - Extreme cold air
-        - Exercise in cold, dry air
-        
-        When to seek emergency care:
-        - Severe shortness of breath or difficulty breathing
-        - No improvement after using rescue inhaler
-        - Shortness of breath when walking or talking
-        - Bluish tint to lips or fingernails
-        """,
-        "diagnosis": "Asthma",
-        "recommendations": [
-            "Use rescue inhaler as prescribed for acute symptoms",
-            "Identify and avoid personal triggers"
-        ],
-        "avoid": [
-            "Known triggers such as allergens, smoke, or pollution",
-            "Extreme cold air which can trigger symptoms"
-        ],
-        "follow_up": "Work with a doctor to develop an asthma action plan"
-    },
-    
-    "urinary tract infection": {
-        "info": """
-        Urinary Tract Infection (UTI)
-        
-        A UTI is an infection in any part of the urinary system, including kidneys, bladder, ureters and urethra. Most infections involve the lower urinary tract — the bladder and urethra.
-        
-        Treatment:
-        - Antibiotics
-        - Pain relievers
-        - Plenty of water
-        
-        Avoid:
-        - Alcohol and caffeine
-        - Spicy foods
-        - Holding urine
-        
-        When to seek medical care:
-        - Blood in urine
-        - Back pain near kidneys
-        - High fever
-        - Nausea and vomiting
-        """,
-        "diagnosis": "Urinary Tract Infection",
-        "recommendations": [
-            "See a doctor for antibiotics which are typically needed",
-            "Drink plenty of water to help flush bacteria"
-        ],
-        "avoid": [
-            "Caffeine, alcohol, and spicy foods which can irritate the bladder",
-            "Delaying urination when you feel the need to go"
-        ],
-        "follow_up": "Complete the full course of antibiotics if prescribed"
-    },
-    
-    "kidney infection": {
-        "info": """
-        Kidney Infection (Pyelonephritis)
-        
-        A kidney infection is a type of urinary tract infection that begins in the urethra or bladder and travels up to one or both kidneys. Symptoms include high fever, abdominal and back pain, and painful urination.
-        
-        Treatment:
-        - Antibiotics
-        - Hospitalization for severe cases
-        - Pain relievers
-        - Plenty of fluids
-        
-        Avoid:
-        - Delaying treatment
-        - Alcohol and caffeine
-        
-        When to seek medical care:
-        - Fever above 101°F (38.3°C)
-        - Persistent pain
-        - Inability to keep down fluids
-        - Blood in urine
-        """,
-        "diagnosis": "Kidney Infection - REQUIRES PROMPT ATTENTION",
-        "recommendations": [
-            "Seek medical attention promptly",
-            "Stay hydrated with water while awaiting medical care"
-        ],
-        "avoid": [
-            "Delaying medical treatment which can lead to serious complications",
-            "Alcohol and caffeine which can worsen dehydration"
-        ],
-        "follow_up": "This condition typically requires antibiotics and possibly hospitalization"
-    },
-    
-    "diabetes": {
-        "info": """
-        Diabetes
-        
-        Diabetes is a disease that occurs when your blood glucose (blood sugar) is too high. Insulin, a hormone made by the pancreas, helps glucose get into your cells to be used for energy. With diabetes, your body either doesn't make enough insulin or can't effectively use the insulin it makes.
-        
-        Treatment:
-        - Monitoring blood sugar levels
-        - Insulin therapy (for Type 1 and some Type 2)
-        - Oral or injectable medications (for Type 2)
-        - Healthy diet and exercise
-        
-        Avoid:
-        - High sugar foods and beverages
-        - Smoking
-        - Sedentary lifestyle
-        
-        When to seek emergency care:
-        - Very high blood sugar with symptoms like extreme thirst, frequent urination
-        - Very low blood sugar with confusion, dizziness, or unconsciousness
-        - Ketoacidosis symptoms including fruity breath, vomiting, abdominal pain
-        """,
-        "diagnosis": "Possible Diabetes",
-        "recommendations": [
-            "See a doctor for proper evaluation and blood testing",
-            "Stay hydrated with water"
-        ],
-        "avoid": [
-            "Sugary foods and beverages",
-            "Delaying medical evaluation"
-        ],
-        "follow_up": "This condition requires proper medical diagnosis and management"
-    },
-    
-    "food poisoning": {
-        "info": """
-        Food Poisoning
-        
-        Food poisoning is illness caused by eating contaminated food. Symptoms often include nausea, vomiting, and diarrhea, which may be severe in some cases.
-        
-        Treatment:
-        - Rest and let your stomach settle
-        - Try sucking on ice chips or taking small sips of water
-        - Gradually return to eating with bland, easy-to-digest foods
-        - Avoid dairy, fatty, spicy and highly seasoned foods
-        
-        Avoid:
-        - Dairy products
-        - Caffeine and alcohol
-        - Nicotine
-        - Fatty or highly seasoned foods
-        
-        When to seek medical care:
-        - Frequent vomiting for more than two days
-        - Blood in vomit or stool
-        - Diarrhea for more than three days
-        - Extreme pain or severe abdominal cramping
-        - An oral temperature higher than 100.4°F (38°C)
-        - Signs of dehydration
-        """,
-        "diagnosis": "Food Poisoning",
-        "recommendations": [
-            "Stay hydrated with clear fluids sipped slowly",
-            "Rest and let your digestive system recover"
-        ],
-        "avoid": [
-            "Dairy products, caffeine, and alcohol",
-            "Solid foods until vomiting stops"
-        ],
-        "follow_up": "If symptoms persist more than 3 days or include bloody diarrhea, see a doctor"
-    },
-    
-    "pulmonary embolism": {
-        "info": """
-        Pulmonary Embolism
-        
-        A pulmonary embolism is a blockage in one of the pulmonary arteries in your lungs, most commonly caused by blood clots that travel from the legs or other parts of the body to the lungs.
-        
-        Treatment:
-        - EMERGENCY MEDICAL CARE IS REQUIRED
-        - Blood thinners (anticoagulants)
-        - Clot-dissolving medications (thrombolytics) for severe cases
-        - Surgical removal or filter for very large clots
-        
-        Avoid:
-        - Delay in seeking medical attention
-        - Physical activity before medical evaluation
-        
-        When to seek emergency care:
-        - Sudden shortness of breath
-        - Chest pain that worsens when you breathe in
-        - Coughing up blood
-        - Rapid or irregular heartbeat
-        - Lightheadedness or fainting
-        """,
-        "diagnosis": "Possible Pulmonary Embolism - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Seek emergency medical care immediately - call 911/ambulance",
-            "Remain calm and try to maintain steady breathing if possible"
-        ],
-        "avoid": [
-            "Any delay in seeking emergency care",
-            "Physical exertion of any kind"
-        ],
-        "follow_up": "This is a life-threatening emergency requiring immediate hospital care"
-    },
-    
-    "shingles": {
-        "info": """
-        Shingles (Herpes Zoster)
-        
-        Shingles is a viral infection that causes a painful rash. It is caused by the varicella-zoster virus, the same virus that causes chickenpox. After you've had chickenpox, the virus lies inactive in nerve tissue. Years later, the virus may reactivate as shingles.
-        
-        Treatment:
-        - Antiviral medications (most effective if started within 72 hours)
-        - Pain medications
-        - Topical antibiotics if blisters become infected
-        - Calamine lotion and cool compresses for itching
-        
-        Avoid:
-        - Scratching the rash
-        - Contact with pregnant women or immunocompromised people
-        - Touching the rash and then touching other parts of your body
-        
-        When to seek medical care:
-        - Rash near the eyes, which can cause eye damage
-        - Widespread rash
-        - Pain or rash accompanied by fever, headache, or sensitivity to light
-        - Swelling, warmth, or redness near the rash
-        """,
-        "diagnosis": "Shingles",
-        "recommendations": [
-            "See a doctor promptly - antiviral medication works best if started early",
-            "Keep the rash clean and covered to prevent spreading to others"
-        ],
-        "avoid": [
-            "Scratching the rash which can lead to infection",
-            "Contact with pregnant women, infants, and those with weakened immune systems"
-        ],
-        "follow_up": "Complete the full course of any prescribed medications"
-    },
-    
-    "bronchitis": {
-        "info": """
-        Bronchitis
-        
-        Bronchitis is inflammation of the lining of the bronchial tubes, which carry air to and from the lungs. People with bronchitis often cough up thickened mucus, which can be discolored.
-        
-        Treatment:
-        - Rest and plenty of fluids
-        - Over-the-counter pain relievers
-        - Humidifier to ease breathing
-        - Antibiotics if the cause is bacterial
-        
-        Avoid:
-        - Smoking and secondhand smoke
-        - Air pollution and lung irritants
-        - Cold, dry air
-        
-        When to seek medical care:
-        - Fever above 100.4°F (38°C)
-        - Cough with bloody or discolored mucus
-        - Shortness of breath or wheezing
-        - Symptoms lasting more than 3 weeks
-        """,
-        "diagnosis": "Bronchitis",
-        "recommendations": [
-            "Rest and drink plenty of fluids to thin mucus secretions",
-            "Use a humidifier or steam to help loosen congestion"
-        ],
-        "avoid": [
-            "Smoking and exposure to secondhand smoke or other respiratory irritants",
-            "Cold, dry air which can aggravate symptoms"
-        ],
-        "follow_up": "If symptoms persist longer than 3 weeks or include high fever, see a doctor"
-    },
-    
-    "anxiety": {
-        "info": """
-        Anxiety Disorders
-        
-        Anxiety disorders are a group of mental health conditions characterized by significant feelings of anxiety and fear. These feelings are strong enough to interfere with one's daily activities.
-        
-        Treatment:
-        - Psychotherapy (especially cognitive behavioral therapy)
-        - Medications (antidepressants, anti-anxiety medications)
-        - Stress management techniques
-        - Regular exercise
-        
-        Self-help strategies:
-        - Deep breathing exercises
-        - Progressive muscle relaxation
-        - Mindfulness meditation
-        - Regular physical activity
-        
-        When to seek medical care:
-        - Anxiety interferes with daily activities
-        - You have suicidal thoughts or behaviors
-        - You have trouble with alcohol or drug use
-        - You have other mental health concerns along with anxiety
-        """,
-        "diagnosis": "Anxiety Disorder",
-        "recommendations": [
-            "Practice deep breathing exercises when feeling anxious",
-            "Consider speaking with a mental health professional for proper evaluation"
-        ],
-        "avoid": [
-            "Caffeine and alcohol which can worsen anxiety",
-            "Avoiding feared situations, which can reinforce anxiety"
-        ],
-        "follow_up": "A mental health professional can help develop an effective treatment plan"
-    },
-    
-    "depression": {
-        "info": """
-        Depression
-        
-        Depression is a common and serious medical illness that negatively affects how you feel, the way you think and how you act. It causes feelings of sadness and/or a loss of interest in activities you once enjoyed.
-        
-        Treatment:
-        - Psychotherapy (especially cognitive behavioral therapy)
-        - Medications (antidepressants)
-        - Lifestyle changes (exercise, sleep hygiene, nutrition)
-        - In severe cases, treatments like ECT or TMS
-        
-        Self-help strategies:
-        - Regular physical activity
-        - Setting small, achievable goals
-        - Social connection and support
-        - Sleep hygiene
-        
-        When to seek emergency care:
-        - Suicidal thoughts or behaviors
-        - Inability to care for yourself
-        - Psychotic symptoms
-        """,
-        "diagnosis": "Depression",
-        "recommendations": [
-            "Consider speaking with a mental health professional for proper evaluation",
-            "Regular physical activity can help improve mood"
-        ],
-        "avoid": [
-            "Social isolation which can worsen symptoms",
-            "Alcohol and drugs which can worsen depression"
-        ],
-        "follow_up": "A mental health professional can help develop an effective treatment plan"
-    },
-    
-    "back pain": {
-        "info": """
-        Back Pain
-        
-        Back pain is one of the most common reasons people seek medical care or miss work. Back pain can range from a muscle aching to a shooting, burning or stabbing sensation.
-        
-        Treatment:
-        - Over-the-counter pain relievers
-        - Hot or cold packs
-        - Gentle activity and stretching
-        - Physical therapy
-        - In some cases, prescription medications
-        
-        Avoid:
-        - Prolonged bed rest
-        - Heavy lifting or activities that strain the back
-        - Poor posture while sitting or standing
-        
-        When to seek medical care:
-        - Pain following trauma like a fall or car accident
-        - Pain accompanied by fever
-        - Pain causing neurological symptoms like weakness or numbness
-        - Pain accompanied by loss of bladder or bowel control
-        - Pain that doesn't improve with rest
-        """,
-        "diagnosis": "Lower Back Pain/Strain",
-        "recommendations": [
-            "Apply ice for the first 48-72 hours, then switch to heat",
-            "Over-the-counter pain relievers can help manage pain and inflammation"
-        ],
-        "avoid": [
-            "Prolonged bed rest which can weaken muscles",
-            "Heavy lifting and twisting movements"
-        ],
-        "follow_up": "If pain persists more than two weeks or is severe, consult a doctor"
-    },
-    
-    "arthritis": {
-        "info": """
-        Arthritis
-        
-        Arthritis is inflammation of one or more joints, causing pain and stiffness that can worsen with age. The most common types are osteoarthritis and rheumatoid arthritis.
-        
-        Treatment:
-        - Pain medications
-        - Physical therapy
-        - Assistive devices
-        - In some cases, surgery
-        - Weight management
-        
-        Self-management:
-        - Regular exercise to maintain joint flexibility
-        - Heat and cold therapy
-        - Assistive devices to reduce strain on joints
-        - Balanced diet and healthy weight
-        
-        When to seek medical care:
-        - Severe pain that interferes with daily activities
-        - Joint deformity
-        - Symptoms accompanied by fever
-        - Rapid onset of symptoms
-        """,
-        "diagnosis": "Arthritis",
-        "recommendations": [
-            "Over-the-counter anti-inflammatory medications can reduce pain and swelling",
-            "Gentle exercises like swimming can help maintain joint mobility"
-        ],
-        "avoid": [
-            "High-impact activities that can stress affected joints",
-            "Remaining in one position for too long"
-        ],
-        "follow_up": "A doctor can determine the specific type of arthritis and recommend appropriate treatment"
-    }
-}
-
-# Additional condition combinations for common symptom groups
-SYMPTOM_COMBINATIONS = {
-    # Common Cold & Flu
-    ("fever", "cough", "sore throat", "body aches"): {
-        "diagnosis": "Common Flu",
-        "recommendations": [
-            "Taking ibuprofen can help reduce fever and pain",
-            "Rest and staying hydrated are essential for recovery"
-        ],
-        "avoid": [
-            "Having cold food and drinks",
-            "Going to work/school and spreading the infection"
-        ],
-        "follow_up": "If the symptoms persist beyond a week, consult a doctor"
-    },
-    ("fever", "headache", "sore throat", "body aches"): {
-        "diagnosis": "Common Flu",
-        "recommendations": [
-            "Taking ibuprofen can help reduce fever and pain",
-            "Getting plenty of rest helps your immune system fight the infection"
-        ],
-        "avoid": [
-            "Having cold food and drinks",
-            "Strenuous activity until recovery"
-        ],
-        "follow_up": "If the symptoms persist, consult a doctor"
-    },
-    ("runny nose", "sneezing", "congestion", "cough"): {
-        "diagnosis": "Common Cold",
-        "recommendations": [
-            "Using over-the-counter decongestants can relieve congestion",
-            "Drinking warm fluids to soothe the throat and thin mucus"
-        ],
-        "avoid": [
-            "Alcohol and smoking which can worsen symptoms",
-            "Sharing personal items like towels or utensils"
-        ],
-        "follow_up": "If symptoms worsen after a week or include high fever, see a doctor"
-    },
-    
-    # Allergies and Respiratory Issues
-    ("headache", "runny nose", "sneezing", "watery eyes"): {
-        "diagnosis": "Seasonal Allergies",
-        "recommendations": [
-            "Over-the-counter antihistamines can provide relief",
-            "Nasal irrigation with saline solution may help clear allergens"
-        ],
-        "avoid": [
-            "Known allergens such as pollen or dust",
-            "Outdoor activities during high pollen count"
-        ],
-        "follow_up": "If symptoms persist beyond a few weeks, consider allergy testing"
-    },
-    ("wheezing", "shortness of breath", "chest tightness", "coughing"): {
-        "diagnosis": "Possible Asthma",
-        "recommendations": [
-            "Avoid known triggers like allergens or exercise if they worsen symptoms",
-            "Use a rescue inhaler if prescribed by your doctor"
-        ],
-        "avoid": [
-            "Smoking and exposure to secondhand smoke",
-            "Environmental irritants such as strong perfumes or cleaning chemicals"
-        ],
-        "follow_up": "This condition requires proper medical evaluation and management plan"
-    },
-    
-    # Serious Respiratory Conditions
-    ("cough", "fever", "shortness of breath", "chest pain"): {
-        "diagnosis": "Possible Pneumonia",
-        "recommendations": [
-            "Seek medical attention promptly - this could be serious",
-            "Rest and stay hydrated in the meantime"
-        ],
-        "avoid": [
-            "Delay in seeking medical care",
-            "Over-exertion which can strain breathing"
-        ],
-        "follow_up": "This condition requires urgent professional medical evaluation"
-    },
-    ("sudden shortness of breath", "chest pain", "rapid breathing", "blue lips"): {
-        "diagnosis": "Possible Pulmonary Embolism - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Seek emergency medical care immediately - call 911/ambulance",
-            "Remain calm and try to maintain steady breathing if possible"
-        ],
-        "avoid": [
-            "Any delay in seeking emergency care",
-            "Physical exertion of any kind"
-        ],
-        "follow_up": "This is a life-threatening emergency requiring immediate hospital care"
-    },
-    
-    # Throat and ENT Conditions
-    ("sore throat", "fever", "difficulty swallowing", "swollen glands"): {
-        "diagnosis": "Possible Strep Throat",
-        "recommendations": [
-            "Gargling with salt water can temporarily relieve pain",
-            "Medical evaluation for possible antibiotic treatment"
-        ],
-        "avoid": [
-            "Acidic or spicy foods that can irritate the throat",
-            "Sharing utensils or drinks with others"
-        ],
-        "follow_up": "See a doctor for proper diagnosis and treatment"
-    },
-    ("ear pain", "hearing difficulty", "fever", "ear discharge"): {
-        "diagnosis": "Possible Ear Infection",
-        "recommendations": [
-            "Over-the-counter pain relievers for discomfort",
-            "Warm compress on the affected ear"
-        ],
-        "avoid": [
-            "Inserting anything into the ear canal",
-            "Swimming or submerging the head underwater"
-        ],
-        "follow_up": "See a doctor if symptoms persist more than 2-3 days"
-    },
-    
-    # Gastrointestinal Conditions
-    ("abdominal pain", "diarrhea", "nausea", "vomiting"): {
-        "diagnosis": "Gastroenteritis (Stomach Flu)",
-        "recommendations": [
-            "Stay hydrated with clear fluids sipped slowly",
-            "Try the BRAT diet (bananas, rice, applesauce, toast) when able to eat"
-        ],
-        "avoid": [
-            "Dairy products, greasy or spicy foods",
-            "Caffeine and alcohol which can worsen dehydration"
-        ],
-        "follow_up": "If symptoms last more than 3 days or include bloody stool, see a doctor"
-    },
-    ("right lower abdominal pain", "nausea", "fever", "loss of appetite"): {
-        "diagnosis": "Possible Appendicitis - REQUIRES MEDICAL ATTENTION",
-        "recommendations": [
-            "Seek immediate medical evaluation",
-            "Do not take pain medications before medical evaluation"
-        ],
-        "avoid": [
-            "Taking laxatives or using heating pads on the abdomen",
-            "Eating or drinking until evaluated by a doctor"
-        ],
-        "follow_up": "This condition may require emergency surgery"
-    },
-    ("heartburn", "chest pain", "regurgitation", "bitter taste in mouth"): {
-        "diagnosis": "Acid Reflux/GERD",
-        "recommendations": [
-            "Over-the-counter antacids can provide temporary relief",
-            "Eat smaller meals and avoid lying down for 3 hours after eating"
-        ],
-        "avoid": [
-            "Spicy, fatty, or acidic foods",
-            "Alcohol, caffeine, and smoking"
-        ],
-        "follow_up": "If symptoms persist more than 2 weeks, consult a doctor"
-    },
-    
-    # Cardiovascular Emergencies
-    ("chest pain", "shortness of breath", "pain radiating to arm or jaw", "sweating"): {
-        "diagnosis": "Possible Heart Attack - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Call 911 or emergency services immediately",
-            "Take aspirin if available and not allergic"
-        ],
-        "avoid": [
-            "Delay in seeking emergency care",
-            "Physical exertion of any kind"
-        ],
-        "follow_up": "This is a life-threatening emergency requiring immediate hospital care"
-    },
-    ("sudden weakness", "facial drooping", "difficulty speaking", "confusion"): {
-        "diagnosis": "Possible Stroke - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Call 911 or emergency services immediately",
-            "Note the time symptoms began"
-        ],
-        "avoid": [
-            "Delay in seeking emergency care",
-            "Taking medications before medical evaluation"
-        ],
-        "follow_up": "This is a time-sensitive emergency requiring immediate hospital care"
-    },
-    
-    # Neurological Conditions
-    ("severe headache", "sensitivity to light", "nausea", "visual disturbances"): {
-        "diagnosis": "Migraine",
-        "recommendations": [
-            "Rest in a dark, quiet room",
-            "Over-the-counter pain relievers may help if taken early"
-        ],
-        "avoid": [
-            "Bright lights and loud noises",
-            "Known trigger foods like aged cheese, alcohol, or chocolate"
-        ],
-        "follow_up": "If migraines are frequent or debilitating, consult a neurologist"
-    },
-    ("sudden severe headache", "stiff neck", "fever", "confusion"): {
-        "diagnosis": "Possible Meningitis - MEDICAL EMERGENCY",
-        "recommendations": [
-            "Seek emergency medical care immediately",
-            "This is a potentially life-threatening condition"
-        ],
-        "avoid": [
-            "Any delay in seeking emergency care",
-            "Taking medications that might mask symptoms"
-        ],
-        "follow_up": "This requires immediate hospital evaluation and treatment"
-    },
-    
-    # Musculoskeletal Conditions
-    ("joint pain", "joint swelling", "stiffness", "limited range of motion"): {
-        "diagnosis": "Possible Arthritis",
-        "recommendations": [
-            "Over-the-counter anti-inflammatory medications can reduce pain and swelling",
-            "Applying ice for 20 minutes several times daily can help reduce inflammation"
-        ],
-        "avoid": [
-            "Activities that cause pain or put stress on affected joints",
-            "Remaining inactive for long periods which can increase stiffness"
-        ],
-        "follow_up": "A doctor can determine the type of arthritis and recommend treatment"
-    },
-    ("lower back pain", "difficulty moving", "muscle spasms", "pain radiating to legs"): {
-        "diagnosis": "Lower Back Strain/Sprain",
-        "recommendations": [
-            "Rest the back for 1-2 days, avoiding activities that cause pain",
-            "Over-the-counter pain relievers and ice packs can reduce pain and swelling"
-        ],
-        "avoid": [
-            "Heavy lifting or twisting movements",
-            "Prolonged bed rest which can weaken muscles"
-        ],
-        "follow_up": "If pain is severe, persists more than a week, or includes numbness, see a doctor"
-    },
-    
-    # Dermatological Conditions
-    ("rash", "itching", "redness", "skin swelling"): {
-        "diagnosis": "Possible Allergic Reaction",
-        "recommendations": [
-            "Over-the-counter antihistamines can reduce itching and swelling",
-            "Cool compresses can soothe irritated skin"
-        ],
-        "avoid": [
-            "Scratching which can worsen symptoms and lead to infection",
-            "Known allergens that may have triggered the reaction"
-        ],
-        "follow_up": "If symptoms include difficulty breathing or swallowing, seek emergency care"
-    },
-    ("painful red rash", "blisters", "tingling", "burning"): {
-        "diagnosis": "Possible Shingles",
-        "recommendations": [
-            "See a doctor promptly - antiviral medication works best if started early",
-            "Over-the-counter pain relievers can help manage pain"
-        ],
-        "avoid": [
-            "Touching or scratching the rash",
-            "Contact with pregnant women or those with weakened immune systems"
-        ],
-        "follow_up": "Medical evaluation is important for proper diagnosis and treatment"
-    },
-    
-    # Urinary/Renal Conditions
-    ("painful urination", "frequent urination", "urgency", "lower abdominal pain"): {
-        "diagnosis": "Possible Urinary Tract Infection",
-        "recommendations": [
-            "Drink plenty of water to help flush bacteria",
-            "See a doctor for antibiotics which are typically needed"
-        ],
-        "avoid": [
-            "Caffeine, alcohol, and spicy foods which can irritate the bladder",
-            "Delaying urination when you feel the need to go"
-        ],
-        "follow_up": "Complete the full course of antibiotics if prescribed"
-    },
-    ("flank pain", "fever", "painful urination", "cloudy urine"): {
-        "diagnosis": "Possible Kidney Infection - REQUIRES PROMPT ATTENTION",
-        "recommendations": [
-            "Seek medical attention promptly",
-            "Stay hydrated with water while awaiting medical care"
-        ],
-        "avoid": [
-            "Delaying medical treatment which can lead to serious complications",
-            "Alcohol and caffeine which can worsen dehydration"
-        ],
-        "follow_up": "This condition typically requires antibiotics and possibly hospitalization"
-    },
-    
-    # Endocrine Conditions
-    ("excessive thirst", "frequent urination", "fatigue", "unexplained weight loss"): {
-        "diagnosis": "Possible Diabetes",
-        "recommendations": [
-            "See a doctor for proper evaluation and blood testing",
-            "Stay hydrated with water"
-        ],
-        "avoid": [
-            "Sugary foods and beverages",
-            "Delaying medical evaluation"
-        ],
-        "follow_up": "This condition requires proper medical diagnosis and management"
-    },
-    
-    # Psychiatric Emergencies
-    ("suicidal thoughts", "hopelessness", "depression", "withdrawal"): {
-        "diagnosis": "Possible Mental Health Crisis - REQUIRES IMMEDIATE ATTENTION",
-        "recommendations": [
-            "Call a crisis hotline immediately - National Suicide Prevention Lifeline: 988",
-            "Do not leave the person alone if possible"
-        ],
-        "avoid": [
-            "Dismissing or minimizing their feelings",
-            "Delay in seeking professional help"
-        ],
-        "follow_up": "Seek professional mental health care urgently"
-    }
-}
+# MEDICAL_DATA and SYMPTOM_COMBINATIONS live in medical_knowledge.py and are loaded
+# from the compiled knowledge file on first use
+KNOWLEDGE_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "medical_knowledge.py")
+knowledge = None
+knowledge_lock = threading.Lock()
+
+def knowledge_is_stale():
+    """Whether the compiled knowledge file is missing or older than its source"""
+    if not os.path.exists(KNOWLEDGE_PATH):
+        return True
+    return os.path.exists(KNOWLEDGE_SOURCE) and os.path.getmtime(KNOWLEDGE_SOURCE) > os.path.getmtime(KNOWLEDGE_PATH)
+
+def load_knowledge():
+    """The compiled knowledge base.
+
+    When the compiled file is missing, stale or unreadable, the knowledge is
+    compiled from medical_knowledge.py and written back, so later starts load
+    the file. If writing fails, this run uses the in-memory copy.
+    """
+    global knowledge
+    with knowledge_lock:
+        if knowledge is None:
+            if not knowledge_is_stale():
+                try:
+                    with open(KNOWLEDGE_PATH, "rb") as f:
+                        loaded = marshal.loads(f.read())
+                    if loaded.get("version") == KNOWLEDGE_VERSION:
+                        knowledge = loaded
+                except Exception as e:
+                    print(f"Error loading compiled knowledge base: {e}")
+            if knowledge is None:
+                print(f"Compiled knowledge base at {KNOWLEDGE_PATH} is missing or out of date; rebuilding it.")
+                knowledge = compile_knowledge()
+                try:
+                    write_knowledge(knowledge, KNOWLEDGE_PATH)
+                except Exception as e:
+                    print(f"Error writing compiled knowledge base: {e}")
+        return knowledge
+
+def get_medical_data():
+    return load_knowledge()["medical_data"]
+
+def get_symptom_combinations():
+    return load_knowledge()["symptom_combinations"]
+
+def __getattr__(name):
+    # Keep MEDICAL_DATA and SYMPTOM_COMBINATIONS importable as module attributes
+    if name == "MEDICAL_DATA":
+        return get_medical_data()
+    if name == "SYMPTOM_COMBINATIONS":
+        return get_symptom_combinations()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class CombinationIndex:
+    """Symptom combinations as bitmasks over interned symptom IDs.
+
+    Each symptom gets an integer ID and each combination the bitmask of its
+    symptoms. Postings map a symptom ID to the combinations containing it, so a
+    query only scores the combinations that share at least one symptom with it,
+    and the overlap is the popcount of the AND of the two masks.
+    """
+
+    def __init__(self):
+        self.symptom_ids = {}  # symptom -> bit position
+        self.combinations = []  # combination ID -> (combination, diagnosis info)
+        self.masks = []  # combination ID -> bitmask of its symptoms
+        self.postings = {}  # symptom ID -> combination IDs containing it
+        self.keys = {}  # combination -> combination ID
+        self.data = None  # the dict the index was last synced to
+
+    def symptom_id(self, symptom):
+        return self.symptom_ids.setdefault(symptom, len(self.symptom_ids))
+
+    def add(self, combination, diagnosis_info):
+        """Index a combination, replacing its diagnosis info if it is already indexed"""
+        if combination in self.keys:
+            self.combinations[self.keys[combination]] = (combination, diagnosis_info)
+            return
+        combination_id = self.keys[combination] = len(self.combinations)
+        mask = 0
+        for symptom in combination:
+            symptom_id = self.symptom_id(symptom)
+            if not mask >> symptom_id & 1:
+                self.postings.setdefault(symptom_id, []).append(combination_id)
+            mask |= 1 << symptom_id
+        self.combinations.append((combination, diagnosis_info))
+        self.masks.append(mask)
+
+    def sync(self, combinations):
+        """Index the combinations added to combinations since the last call, rebuilding if any were removed.
+
+        A different dict is indexed from scratch. For the same dict only a change
+        in size is noticed, so swapping one combination for another needs a new
+        index.
+        """
+        if combinations is not self.data:
+            self.__init__()
+            self.data = combinations
+        elif len(combinations) == len(self.keys):
+            return
+        if any(combination not in combinations for combination in self.keys):
+            self.__init__()
+            self.data = combinations
+        for combination, diagnosis_info in combinations.items():
+            if combination not in self.keys:
+                self.add(combination, diagnosis_info)
+
+    def rank(self, symptoms, k=None):
+        """Good matches as (combination, diagnosis info, matched count, overlap ratio), best first.
+
+        A combination is a good match when at least half of its symptoms are
+        present, or at least 3 for combinations of 4 or more. Matches rank by
+        the number of matched symptoms, ties keeping the order of the data.
+        """
+        query_mask = 0
+        candidates = set()
+        for symptom in symptoms:
+            symptom_id = self.symptom_ids.get(symptom)
+            if symptom_id is not None:
+                query_mask |= 1 << symptom_id
+                candidates.update(self.postings[symptom_id])
+
+        matches = []
+        for combination_id in candidates:
+            combination, diagnosis_info = self.combinations[combination_id]
+            matched = bin(self.masks[combination_id] & query_mask).count("1")
+            if (len(combination) >= 4 and matched >= 3) or matched >= len(combination) / 2:
+                matches.append((combination_id, matched))
+
+        key = lambda match: (-match[1], match[0])
+        ranked = heapq.nsmallest(k, matches, key=key) if k is not None else sorted(matches, key=key)
+        return [(*self.combinations[combination_id], matched, matched / len(self.combinations[combination_id][0]))
+                for combination_id, matched in ranked]
+
+# Indexes of the most recently used dicts, least recent first. Each index holds
+# its dict, so an id cannot be reused by another dict while it is cached here.
+COMBINATION_INDEX_LIMIT = 8
+combination_indexes = {}  # id(combinations) -> CombinationIndex
+
+def get_combination_index(combinations=None):
+    """The index for a combinations dict (SYMPTOM_COMBINATIONS by default), brought up to date with it"""
+    if combinations is None:
+        combinations = get_symptom_combinations()
+    index = combination_indexes.pop(id(combinations), None)
+    if index is None or index.data is not combinations:
+        index = CombinationIndex()
+    combination_indexes[id(combinations)] = index
+    while len(combination_indexes) > COMBINATION_INDEX_LIMIT:
+        del combination_indexes[next(iter(combination_indexes))]
+    index.sync(combinations)
+    return index
+
+def rank_combinations(symptoms, k=None, combinations=None):
+    """Ranked symptom combination matches as (combination, diagnosis info, matched count, overlap ratio)"""
+    if not symptoms or len(symptoms) < 2:
+        return []
+    if combinations is None:
+        combinations = get_symptom_combinations()
+    ranked = get_combination_index(combinations).rank(symptoms, k)
+    # Diagnosis info comes from the dict, which may have been replaced since indexing
+    return [(combination, combinations[combination], matched, overlap) for combination, _, matched, overlap in ranked]
 
 def find_matching_combination(symptoms):
     """
     Find the best matching symptom combination from SYMPTOM_COMBINATIONS.
     Returns the diagnosis information from the best match.
     """
-    if not symptoms or len(symptoms) < 2:
-        return None
-    
-    # Find best matching symptom combination by scoring matches
-    best_match = None
-    best_match_score = 0
-    best_match_key = None
-    
-    for combination, diagnosis_info in SYMPTOM_COMBINATIONS.items():
-        # Count how many symptoms from the combination are in our symptoms list
-        matched_symptoms = set(combination).intersection(set(symptoms))
-        match_score = len(matched_symptoms)
-        
-        # Consider a match if at least 50% of symptoms in a combination match
-        # or at least 3 symptoms match for larger combinations
-        is_good_match = False
-        if len(combination) >= 4 and match_score >= 3:
-            is_good_match = True
-        elif match_score >= len(combination) / 2:
-            is_good_match = True
-            
-        # Update best match if this one has a higher score
-        if is_good_match and match_score > best_match_score:
-            best_match_score = match_score
-            best_match = diagnosis_info
-            best_match_key = combination
-            
-    # If we found a good match, return the diagnosis information
-    if best_match:
-        print(f"Matched symptom combination: {best_match_key} with score {best_match_score}")
+    ranked = rank_combinations(symptoms, k=1)
+    if ranked:
+        combination, best_match, score, overlap = ranked[0]
+        print(f"Matched symptom combination: {combination} with score {score} ({overlap:.0%} overlap)")
         return best_match
     
     return None
 
-def simple_search(query, data=MEDICAL_DATA):
-    """Simple keyword-based search through medical data"""
+SEARCH_STOP_WORDS = {"a", "the", "and", "or", "but", "in", "on", "at", "to", "for", "with", "about", "is", "are",
+                     "i", "me", "my", "have", "has", "having", "been", "am", "of", "it", "bad",
+                     # Filler words of everyday speech ("can't" tokenizes to "can" and "t")
+                     "all", "time", "can", "t", "s", "not", "do", "does", "very", "really", "so", "just",
+                     "get", "got", "feel", "feels", "feeling", "like", "lot"}
+
+# Suffixes by which a query word and an indexed term may differ ("sad" matches "sadness")
+SEARCH_SUFFIXES = ("s", "es", "ness", "ing", "ed")
+
+# Share of the query words a condition must match to be returned
+MIN_QUERY_SHARE = 0.5
+
+def search_tokens(text):
+    """Lowercase word tokens without stop words"""
+    return [word for word in re.findall(r'\b\w+\b', text.lower()) if word not in SEARCH_STOP_WORDS]
+
+SECTION_HEADER = re.compile(r'^[^\n]*:\s*$', re.MULTILINE)
+
+def search_fields(condition, condition_data):
+    """The text of each SearchIndex field: name, symptom overview and the rest of the info"""
+    info = condition_data["info"].strip()
+    # The info starts with a title line and an overview paragraph (which lists the
+    # symptoms) before sections such as "Treatment:"
+    title, _, body = info.partition("\n")
+    header = SECTION_HEADER.search(body)
+    overview, details = (body[:header.start()], body[header.start():]) if header else (body, "")
+    return (f"{condition} {title} {condition_data.get('diagnosis', '')}", overview, details)
+
+class SearchIndex:
+    """BM25F inverted index over condition names, symptom overviews and the rest of the info.
+
+    Postings map each term to {condition: term frequency per field}. Each field
+    is length-normalized and saturated on its own and then weighted, so a term
+    in the condition name or in the symptom overview outweighs any number of
+    mentions in the free-text info. IDF is computed from the postings at query
+    time, so adding or replacing a condition only touches that condition's
+    postings (and marks the length norms for recomputation).
+
+    A query word matches its indexed forms with or without a common suffix,
+    and a condition's score is scaled by the share of query words it matches,
+    so matching most of the query beats matching one word well.
+
+    search() keeps the top k exact but skips work with MaxScore pruning: words
+    are visited rarest first, and once the k-th best score exceeds what the
+    remaining words could add at most, those words only update the conditions
+    already scored.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, field_weights=(6.0, 2.0, 1.0)):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights
+        self.postings = {}  # term -> {condition: tuple of per-field term frequencies}
+        self.lengths = {}  # condition -> tuple of per-field lengths in tokens
+        self.terms = {}  # condition -> its distinct terms, to remove it again
+        self.order = {}  # condition -> insertion order, to break ties like the data does
+        self.total_lengths = [0] * len(field_weights)
+        self.norms = None  # condition -> per-field BM25 length norms, recomputed after changes
+        self.impacts = {}  # term -> {condition: weighted saturated frequency}, filled on demand
+        self.word_matches = {}  # query word -> word_impacts(word), filled on demand
+        self.data = None  # the dict the index was last synced to
+
+    def add(self, condition, condition_data):
+        """Index a condition, replacing its previous entry if any"""
+        self.remove(condition)
+        fields = [search_tokens(text) for text in search_fields(condition, condition_data)]
+        frequencies = {}
+        for field, tokens in enumerate(fields):
+            for term in tokens:
+                counts = frequencies.setdefault(term, [0] * len(fields))
+                counts[field] += 1
+        for term, counts in frequencies.items():
+            self.postings.setdefault(term, {})[condition] = tuple(counts)
+        self.terms[condition] = tuple(frequencies)
+        self.lengths[condition] = tuple(len(tokens) for tokens in fields)
+        self.order.setdefault(condition, len(self.order))
+        for field, tokens in enumerate(fields):
+            self.total_lengths[field] += len(tokens)
+        self.norms = None
+        self.impacts = {}
+        self.word_matches = {}
+
+    def remove(self, condition):
+        if condition not in self.lengths:
+            return
+        for term in self.terms.pop(condition):
+            documents = self.postings[term]
+            del documents[condition]
+            if not documents:
+                del self.postings[term]
+        for field, length in enumerate(self.lengths.pop(condition)):
+            self.total_lengths[field] -= length
+        self.norms = None
+        self.impacts = {}
+        self.word_matches = {}
+
+    def sync(self, data):
+        """Bring the index up to date with data if it changed since the last sync.
+
+        A different dict is indexed from scratch. For the same dict, a size check
+        catches conditions added or removed directly (add_condition and
+        remove_condition update the index themselves, and replacing a condition
+        in place needs add_condition). Both checks are O(1), so a search does not
+        compare every key.
+        """
+        if data is not self.data:
+            self.__init__(self.k1, self.b, self.field_weights)
+            self.data = data
+        elif len(data) == len(self.lengths):
+            return
+        for condition in [condition for condition in self.lengths if condition not in data]:
+            self.remove(condition)
+        for condition, condition_data in data.items():
+            if condition not in self.lengths:
+                self.add(condition, condition_data)
+
+    def score(self, frequencies, norms):
+        """Weighted sum of the saturated per-field term frequencies"""
+        k1 = self.k1
+        return sum(weight * frequency * (k1 + 1) / (frequency + norm)
+                   for weight, frequency, norm in zip(self.field_weights, frequencies, norms) if frequency)
+
+    def term_impacts(self, term):
+        """{condition: score before IDF} for a term, cached until the index changes"""
+        impacts = self.impacts.get(term)
+        if impacts is None:
+            norms = self.norms
+            impacts = self.impacts[term] = {condition: self.score(frequencies, norms[condition])
+                                            for condition, frequencies in self.postings[term].items()}
+        return impacts
+
+    def term_variants(self, word):
+        """The indexed terms a query word matches: itself and its forms with or without a suffix"""
+        variants = [word]
+        if len(word) >= 3:
+            variants += [word + suffix for suffix in SEARCH_SUFFIXES]
+            variants += [word[:-len(suffix)] for suffix in SEARCH_SUFFIXES
+                         if word.endswith(suffix) and len(word) - len(suffix) >= 3]
+        return [term for term in dict.fromkeys(variants) if term in self.postings]
+
+    def word_impacts(self, word):
+        """{condition: (score before IDF, whether the name or overview has it)} for a query word, cached"""
+        impacts = self.word_matches.get(word)
+        if impacts is not None:
+            return impacts
+        impacts = self.word_matches[word] = {}
+        for term in self.term_variants(word):
+            postings = self.postings[term]
+            for condition, impact in self.term_impacts(term).items():
+                key = any(postings[condition][:2])
+                previous = impacts.get(condition)
+                if previous:
+                    impact, key = max(impact, previous[0]), key or previous[1]
+                impacts[condition] = (impact, key)
+        return impacts
+
+    def search(self, query, k=2, min_share=0.0, strict=None):
+        """The k best (condition, score) pairs for the query.
+
+        Conditions matching less than min_share of the query words are left
+        out. For conditions where strict(condition) is true, only the words
+        found in the name or symptom overview count towards that share.
+        """
+        count = len(self.lengths)
+        words = set(search_tokens(query))
+        if not count or not words:
+            return []
+        if self.norms is None:
+            averages = [max(total / count, 1) for total in self.total_lengths]
+            self.norms = {condition: tuple(self.k1 * (1 - self.b + self.b * length / average)
+                                           for length, average in zip(lengths, averages))
+                          for condition, lengths in self.lengths.items()}
+
+        # Rarest words first; bounds[i] is the highest final score a condition
+        # matching none of the words before i can still reach
+        matches = sorted(((len(impacts), word, impacts) for word in words for impacts in [self.word_impacts(word)]
+                          if impacts), key=lambda match: match[:2])
+        idfs = [math.log(1 + (count - size + 0.5) / (size + 0.5)) for size, _, _ in matches]
+        most = (self.k1 + 1) * sum(self.field_weights)
+        bounds = [sum(idfs[i:]) * most * (len(matches) - i) / len(words) for i in range(len(matches))]
+
+        # condition -> [BM25F score, words matched, words counted towards min_share, strict]
+        scores = {}
+        needed = min_share * len(words)
+
+        def final_scores():
+            # Shares only grow, so these are lower bounds on the final scores
+            return {condition: score * matched / len(words)
+                    for condition, (score, matched, counted, _) in scores.items() if counted >= needed}
+
+        pruned = False
+        for i, ((_, _, impacts), idf, bound) in enumerate(zip(matches, idfs, bounds)):
+            # Once pruned, no condition outside the current candidates can reach the top k,
+            # or match min_share of the words (the k-th best score only grows and the
+            # bounds only shrink, so it stays pruned)
+            if not pruned:
+                current = final_scores()
+                pruned = len(matches) - i < needed or (
+                    len(current) >= k and heapq.nlargest(k, current.values())[-1] > bound)
+            for condition, (impact, key) in impacts.items():
+                score = scores.get(condition)
+                if score is None:
+                    if pruned:
+                        continue
+                    score = scores[condition] = [0.0, 0, 0, bool(strict and strict(condition))]
+                score[0] += idf * impact
+                score[1] += 1
+                score[2] += key or not score[3]
+        return heapq.nlargest(k, final_scores().items(), key=lambda item: (item[1], -self.order[item[0]]))
+
+# Indexes of the most recently searched dicts, least recent first. Each index holds
+# its dict, so an id cannot be reused by another dict while it is cached here.
+SEARCH_INDEX_LIMIT = 8
+search_indexes = {}  # id(data) -> SearchIndex
+
+def get_search_index(data):
+    """The index for a data dict, brought up to date with it"""
+    index = search_indexes.pop(id(data), None)
+    if index is None or index.data is not data:
+        index = SearchIndex()
+    search_indexes[id(data)] = index
+    while len(search_indexes) > SEARCH_INDEX_LIMIT:
+        del search_indexes[next(iter(search_indexes))]
+    index.sync(data)
+    return index
+
+def add_condition(condition, condition_data, data=None):
+    """Add or replace a condition and update its search index incrementally"""
+    if data is None:
+        data = get_medical_data()
+    index = get_search_index(data)
+    data[condition] = condition_data
+    index.add(condition, condition_data)
+
+def remove_condition(condition, data=None):
+    """Remove a condition and drop it from its search index"""
+    if data is None:
+        data = get_medical_data()
+    index = get_search_index(data)
+    data.pop(condition, None)
+    index.remove(condition)
+
+def simple_search(query, data=None):
+    """BM25 search through medical data (MEDICAL_DATA by default)"""
+    if data is None:
+        data = get_medical_data()
     query = query.lower()
-    results = []
-    
-    # Extract keywords (remove common stop words)
-    stop_words = {"a", "the", "and", "or", "but", "in", "on", "at", "to", "for", "with", "about", "is", "are"}
-    keywords = [word for word in re.findall(r'\b\w+\b', query) if word not in stop_words]
-    
-    # Search through data
-    for condition, condition_data in data.items():
-        score = 0
-        info = condition_data["info"]
-        
-        for keyword in keywords:
-            if keyword in condition.lower():
-                score += 10  # Higher weight for matches in the condition name
-            if keyword in info.lower():
-                score += 1  # Lower weight for matches in the description
-        
-        if score > 0:
-            results.append((condition, condition_data, score))
-    
-    # Sort by relevance score
-    results.sort(key=lambda x: x[2], reverse=True)
+    # Emergency entries are only returned when the query matches their name or symptoms
+    emergency = lambda condition: "EMERGENCY" in data[condition].get("diagnosis", "")
+    matches = get_search_index(data).search(query, k=2, min_share=MIN_QUERY_SHARE, strict=emergency)
+    results = [(condition, data[condition], score) for condition, score in matches]
     
     # If no results, return general health advice
     if not results:
@@ -1297,83 +479,170 @@ def simple_search(query, data=MEDICAL_DATA):
         "follow_up": top_data["follow_up"]
     }
 
+# Enhanced comprehensive list of common symptoms to look for
+SYMPTOM_LEXICON = list(dict.fromkeys([
+    # Respiratory symptoms
+    "fever", "cough", "sneezing", "runny nose", "congestion", "nasal congestion", "stuffy nose", 
+    "sore throat", "shortness of breath", "difficulty breathing", "chest pain", "wheezing",
+    "phlegm", "mucus", "post nasal drip", "hoarse voice", "loss of smell", "loss of taste",
+    
+    # Pain and discomfort
+    "headache", "migraine", "body aches", "muscle pain", "joint pain", "back pain", "neck pain", 
+    "stomach pain", "abdominal pain", "chest tightness", "ear pain", "toothache", "eye pain",
+    "throat pain", "painful swallowing", "painful urination", "leg pain", "foot pain", "arm pain",
+    
+    # Gastrointestinal
+    "nausea", "vomiting", "diarrhea", "constipation", "bloating", "gas", "indigestion", 
+    "heartburn", "stomach cramps", "blood in stool", "black stool", "loss of appetite",
+    "increased appetite", "difficulty swallowing", "abdominal distension", "flatulence",
+    
+    # Skin issues
+    "rash", "hives", "itching", "swelling", "redness", "bruising", "dry skin", "blisters",
+    "acne", "sweating", "excessive sweating", "night sweats", "cold sweats", "chills", "sweats",
+    "jaundice", "yellowing skin", "yellowing eyes", "skin lesions", "skin peeling",
+    
+    # Cardiovascular
+    "chest pain", "heart palpitations", "rapid heartbeat", "irregular heartbeat", "slow heartbeat",
+    "high blood pressure", "low blood pressure", "dizziness", "fainting", "lightheadedness",
+    "swollen ankles", "swollen feet", "swollen legs", "calf pain", "claudication",
+    
+    # Neurological
+    "dizziness", "vertigo", "confusion", "memory loss", "forgetfulness", "seizure", "tremor",
+    "tingling", "numbness", "weakness", "paralysis", "difficulty speaking", "slurred speech",
+    "double vision", "blurred vision", "loss of balance", "poor coordination", "difficulty walking",
+    
+    # Psychological
+    "anxiety", "depression", "mood swings", "irritability", "fatigue", "tiredness", "insomnia", 
+    "difficulty sleeping", "excessive sleeping", "nightmares", "stress", "panic attacks", 
+    "hallucinations", "paranoia", "feeling sad", "feeling worried", "mental confusion",
+    
+    # Urinary/Renal
+    "frequent urination", "painful urination", "blood in urine", "dark urine", "cloudy urine",
+    "foul-smelling urine", "urgency to urinate", "difficulty urinating", "incontinence",
+    "decreased urination", "flank pain", "kidney pain",
+    
+    # Reproductive/Menstrual
+    "irregular periods", "heavy periods", "painful periods", "missed periods", "vaginal discharge",
+    "vaginal bleeding", "vaginal dryness", "testicular pain", "erectile dysfunction", "genital sores",
+    "genital itching", "genital burning", "genital rash", "pelvic pain", "cramping",
+    
+    # General
+    "weight loss", "weight gain", "fever", "fatigue", "weakness", "tired", "malaise", "chills",
+    "night sweats", "swollen glands", "swollen lymph nodes", "dehydration", "thirst", "excessive thirst",
+    "lethargy", "feeling unwell", "body aches", "discomfort", "disorientation"
+]))  # Drop the entries listed under several categories
+
+# Suffixes a lexicon term may carry and still match ("" is the bare term)
+INFLECTION_SUFFIXES = ("", "s", "es", "ing", "ed")
+
+class SymptomScanner:
+    """Aho-Corasick automaton over a symptom lexicon, built once.
+
+    scan() finds every lexicon entry in a single pass over the text, keeps the
+    matches that start and end on word boundaries, and resolves overlaps
+    leftmost-longest (so "night sweats" wins over "sweats"). pyahocorasick is
+    used when it is installed, otherwise a pure-Python automaton.
+    """
+
+    def __init__(self, lexicon):
+        self.lexicon = list(dict.fromkeys(term.lower() for term in lexicon if term))
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for index, term in enumerate(self.lexicon):
+                self.automaton.add_word(term, index)
+            self.automaton.make_automaton()
+        else:
+            self.automaton = None
+            self.build()
+
+    def build(self):
+        # Trie: goto[node] maps a character to the next node; outputs[node] are lexicon indexes ending there
+        self.goto = [{}]
+        self.outputs = [[]]
+        for index, term in enumerate(self.lexicon):
+            node = 0
+            for char in term:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.outputs.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.outputs[node].append(index)
+
+        # Failure links, breadth first; each node also inherits the outputs of its failure node.
+        # The failure links are then folded into the transitions, so scanning never backtracks.
+        fail = [0] * len(self.goto)
+        self.transitions = [dict(self.goto[0])] + [None] * (len(self.goto) - 1)
+        queue = list(self.goto[0].values())
+        for node in queue:
+            self.transitions[node] = {**self.transitions[fail[node]], **self.goto[node]}
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fail[child] = self.transitions[fail[node]].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[fail[child]]
+
+    def matches(self, text):
+        """All (start, end, lexicon index) occurrences, overlapping ones included"""
+        if self.automaton is not None:
+            for end, index in self.automaton.iter(text):
+                yield end + 1 - len(self.lexicon[index]), end + 1, index
+            return
+        node = 0
+        transitions, outputs = self.transitions, self.outputs
+        for position, char in enumerate(text):
+            node = transitions[node].get(char, 0)
+            if outputs[node]:
+                for index in outputs[node]:
+                    yield position + 1 - len(self.lexicon[index]), position + 1, index
+
+    @staticmethod
+    def word_end(text, end):
+        """Where the word ending a match at `end` stops, allowing an inflectional suffix; None mid-word"""
+        for suffix in INFLECTION_SUFFIXES:
+            if text.startswith(suffix, end):
+                stop = end + len(suffix)
+                if stop == len(text) or not text[stop].isalnum():
+                    return stop
+        return None
+
+    def scan(self, text):
+        """Non-overlapping (start, end, symptom) spans on word boundaries, leftmost-longest.
+
+        A match may be followed by an inflectional suffix ("headaches",
+        "coughing"); the span then covers the suffix but reports the lexicon term.
+        """
+        text = text.lower()
+        candidates = []
+        for start, end, index in self.matches(text):
+            if start == 0 or not text[start - 1].isalnum():
+                stop = self.word_end(text, end)
+                if stop is not None:
+                    candidates.append((start, -stop, index))
+        candidates.sort()
+        spans = []
+        covered = 0
+        for start, negative_end, index in candidates:
+            if start >= covered:
+                spans.append((start, -negative_end, self.lexicon[index]))
+                covered = -negative_end
+        return spans
+
+symptom_scanner = None
+
+def get_symptom_scanner():
+    """Build the scanner on first use"""
+    global symptom_scanner
+    if symptom_scanner is None:
+        symptom_scanner = SymptomScanner(SYMPTOM_LEXICON)
+    return symptom_scanner
+
 def extract_symptoms_from_query(query):
-    """Extract potential symptoms from the query"""
-    # Enhanced comprehensive list of common symptoms to look for
-    common_symptoms = [
-        # Respiratory symptoms
-        "fever", "cough", "sneezing", "runny nose", "congestion", "nasal congestion", "stuffy nose", 
-        "sore throat", "shortness of breath", "difficulty breathing", "chest pain", "wheezing",
-        "phlegm", "mucus", "post nasal drip", "hoarse voice", "loss of smell", "loss of taste",
-        
-        # Pain and discomfort
-        "headache", "migraine", "body aches", "muscle pain", "joint pain", "back pain", "neck pain", 
-        "stomach pain", "abdominal pain", "chest tightness", "ear pain", "toothache", "eye pain",
-        "throat pain", "painful swallowing", "painful urination", "leg pain", "foot pain", "arm pain",
-        
-        # Gastrointestinal
-        "nausea", "vomiting", "diarrhea", "constipation", "bloating", "gas", "indigestion", 
-        "heartburn", "stomach cramps", "blood in stool", "black stool", "loss of appetite",
-        "increased appetite", "difficulty swallowing", "abdominal distension", "flatulence",
-        
-        # Skin issues
-        "rash", "hives", "itching", "swelling", "redness", "bruising", "dry skin", "blisters",
-        "acne", "sweating", "excessive sweating", "night sweats", "cold sweats", "chills", "sweats",
-        "jaundice", "yellowing skin", "yellowing eyes", "skin lesions", "skin peeling",
-        
-        # Cardiovascular
-        "chest pain", "heart palpitations", "rapid heartbeat", "irregular heartbeat", "slow heartbeat",
-        "high blood pressure", "low blood pressure", "dizziness", "fainting", "lightheadedness",
-        "swollen ankles", "swollen feet", "swollen legs", "calf pain", "claudication",
-        
-        # Neurological
-        "dizziness", "vertigo", "confusion", "memory loss", "forgetfulness", "seizure", "tremor",
-        "tingling", "numbness", "weakness", "paralysis", "difficulty speaking", "slurred speech",
-        "double vision", "blurred vision", "loss of balance", "poor coordination", "difficulty walking",
-        
-        # Psychological
-        "anxiety", "depression", "mood swings", "irritability", "fatigue", "tiredness", "insomnia", 
-        "difficulty sleeping", "excessive sleeping", "nightmares", "stress", "panic attacks", 
-        "hallucinations", "paranoia", "feeling sad", "feeling worried", "mental confusion",
-        
-        # Urinary/Renal
-        "frequent urination", "painful urination", "blood in urine", "dark urine", "cloudy urine",
-        "foul-smelling urine", "urgency to urinate", "difficulty urinating", "incontinence",
-        "decreased urination", "flank pain", "kidney pain",
-        
-        # Reproductive/Menstrual
-        "irregular periods", "heavy periods", "painful periods", "missed periods", "vaginal discharge",
-        "vaginal bleeding", "vaginal dryness", "testicular pain", "erectile dysfunction", "genital sores",
-        "genital itching", "genital burning", "genital rash", "pelvic pain", "cramping",
-        
-        # General
-        "weight loss", "weight gain", "fever", "fatigue", "weakness", "tired", "malaise", "chills",
-        "night sweats", "swollen glands", "swollen lymph nodes", "dehydration", "thirst", "excessive thirst",
-        "lethargy", "feeling unwell", "body aches", "discomfort", "disorientation"
-    ]
-    
-    # Check for symptoms in the query
+    """Extract potential symptoms from the query, in the order they appear"""
     found_symptoms = []
-    query_lower = query.lower()
-    
-    # First pass: exact matches
-    for symptom in common_symptoms:
-        if symptom in query_lower:
+    for _, _, symptom in get_symptom_scanner().scan(query):
+        if symptom not in found_symptoms:
             found_symptoms.append(symptom)
-    
-    # Remove overlapping symptoms (keep the most specific one)
-    # For example, if both "runny nose" and "nose" are found, keep only "runny nose"
-    final_symptoms = []
-    for symptom in found_symptoms:
-        should_add = True
-        for other_symptom in found_symptoms:
-            if symptom != other_symptom and symptom in other_symptom:
-                should_add = False
-                break
-        if should_add:
-            final_symptoms.append(symptom)
-    
-    return final_symptoms
+    return found_symptoms
 
 def Rag(query):
     """Function to query the RAG system and get information with improved symptom matching."""
@@ -9,25 +9,33 @@ from Frontend.GUI import (
     GraphicalUserInterface,
     SetAssistantStatus,
     ShowTextToScreen,
-    TempDictonaryPath,
     SetMicrophoneStatus,
     AnswerModifier,
     QueryModifier,
     GetMicrophoneStatus,
     GetAssistantStatus,
     GetTextInput,  # Function for textbox
-    SetTextInput   # For setting text input
+    SetTextInput,  # For setting text input
+    ShowStreamingText,
+    FinishStreamingText,
+    GetImageUpload,
+    SetImageUpload,
+    ShowDiagnosis
 )
+from Frontend.EventBus import bus, MicrophoneToggled, TextSubmitted, ImageUploaded
 from Backend.Model import FirstLayerDMM
 from Backend.SpeechToText import SpeechRecognition
-from Backend.Chatbot import ChatBot  # Now DocBot
-from Backend.TextToSpeech import TTS
+from Backend.Chatbot import ChatBot, ChatBotStream, demographic_enricher  # Now DocBot
+from Backend.ChatStore import chat_store
+from Backend.TextToSpeech import TTS, SentenceSplitter, SpeechPipeline
 from PyQt5.QtCore import QTimer, QObject, pyqtSignal
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 username = env_vars.get("Username")
 assistant_name = "DocBot"  # Fixed name for AI Doctor
+# "fused" lets one Groq call both classify and answer; "two-stage" keeps the Cohere decision first
+decision_mode = (env_vars.get("DecisionMode") or "two-stage").lower()
 default_message = f'''{username} : Hello, I am Moksh. I would like you to assist me with some health concerns.
 {assistant_name} : Hello Moksh, I am you AI based doctor, i will give you a diagnosis in maximum of 3 coversation in which i will be asking your symptoms and things you have noticed. i will provide u a diagnosis along with some basic medication whcih you should be looking forward to take
 '''
@@ -37,18 +45,17 @@ def initialize_json_files():
     # Ensure Data directory exists
     os.makedirs("Data", exist_ok=True)
     
-    # Initialize ChatLog.json to always start with just the initial welcome messages
-    with open("Data/ChatLog.json", "w", encoding="utf-8") as f:
-        json.dump([
-            {
-                "role": "user",
-                "content": "Hello, I am Moksh. I would like you to assist me with some health concerns."
-            },
-            {
-                "role": "assistant",
-                "content": "Hello Moksh, I am you AI based doctor, i will give you a diagnosis in maximum of 3 coversation in which i will be asking your symptoms and things you have noticed. i will provide u a diagnosis along with some basic medication whcih you should be looking forward to take"
-            }
-        ], f, indent=4)
+    # Initialize the chat log to always start with just the initial welcome messages
+    chat_store.reset([
+        {
+            "role": "user",
+            "content": "Hello, I am Moksh. I would like you to assist me with some health concerns."
+        },
+        {
+            "role": "assistant",
+            "content": "Hello Moksh, I am you AI based doctor, i will give you a diagnosis in maximum of 3 coversation in which i will be asking your symptoms and things you have noticed. i will provide u a diagnosis along with some basic medication whcih you should be looking forward to take"
+        }
+    ])
     
     # Always reset demographic.json to empty values at program start
     with open("Data/demographic.json", "w", encoding="utf-8") as f:
@@ -149,16 +156,11 @@ def initialize_json_files():
 
 def show_default_chat_if_no_chats():
     """Update the display with the default welcome messages"""
-    with open(TempDictonaryPath("Database.data"), "w", encoding="utf-8") as db_file:
-        db_file.write("")
-    with open(TempDictonaryPath("Responses.data"), "w", encoding="utf-8") as response_file:
-        # Use the welcome messages that are already in ChatLog.json
-        response_file.write(default_message)
+    # Use the welcome messages that are already in ChatLog.json
+    ShowTextToScreen(default_message)
 
 def read_chat_log_json():
-    with open(r"Data\ChatLog.json", "r", encoding="utf-8") as file:
-        chatlog_data = json.load(file)
-    return chatlog_data
+    return chat_store.messages()
 
 def integrate_chat_log():
     json_data = read_chat_log_json()
@@ -170,17 +172,11 @@ def integrate_chat_log():
             formatted_chatlog += f"Assistant: {entry['content']}\n"
     formatted_chatlog = formatted_chatlog.replace("User", f"{username} ")
     formatted_chatlog = formatted_chatlog.replace("Assistant", f"{assistant_name} ")
-    with open(TempDictonaryPath("Database.data"), "w", encoding="utf-8") as file:
-        file.write(AnswerModifier(formatted_chatlog))
+    return AnswerModifier(formatted_chatlog)
 
-def show_chats_on_gui():
-    with open(TempDictonaryPath("Database.data"), "r", encoding="utf-8") as file:
-        data = file.read()
+def show_chats_on_gui(data):
     if len(str(data)) > 0:
-        lines = data.split("\n")
-        result = '\n'.join(lines)
-        with open(TempDictonaryPath("Responses.data"), "w", encoding="utf-8") as response_file:
-            response_file.write(result)
+        ShowTextToScreen(data)
 
 def initial_execution():
     # Initialize JSON files first
@@ -190,40 +186,83 @@ def initial_execution():
     ShowTextToScreen("")
     
     # Now that ChatLog.json always has content, we can directly integrate and show
-    integrate_chat_log()
-    show_chats_on_gui()
+    show_chats_on_gui(integrate_chat_log())
+
+async def iterate_in_thread(iterator):
+    """Run a blocking iterator in a worker thread and yield its items on the event loop"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+
+    def pump():
+        try:
+            for item in iterator:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            print(f"Error in background iterator: {e}")
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    loop.run_in_executor(None, pump)
+    while True:
+        item = await queue.get()
+        if item is done:
+            return
+        yield item
+
+async def speak_streamed_answer(stream):
+    """Show and speak a ChatBotStream as it arrives; returns the final answer"""
+    # Speak each sentence as soon as it is complete instead of waiting for the whole answer
+    splitter = SentenceSplitter()
+    speech = SpeechPipeline()
+    answering = False
+    async for delta in iterate_in_thread(stream):
+        ShowStreamingText(delta)
+        for sentence in splitter.feed(delta):
+            if not answering:
+                SetAssistantStatus("Answering...")
+                answering = True
+            speech.say(sentence)
+    for sentence in splitter.flush():
+        speech.say(sentence)
+    answer = stream.answer
+    FinishStreamingText(answer)
+    SetAssistantStatus("Answering...")
+    await speech.finish()
+    return answer
 
 async def main_execution():
     # Check for text input from GUI first
     text_query = GetTextInput()
+    image_path = GetImageUpload()
     if text_query:
         query = text_query
         SetAssistantStatus("Thinking...")
         SetTextInput("None")
+    elif image_path:
+        query = "Analyze this image."
+        SetAssistantStatus("Thinking...")
     else:
         SetAssistantStatus("Listening...")
         query = SpeechRecognition()
         ShowTextToScreen(f"{username} : {query}")
         SetAssistantStatus("Thinking...")
 
-    # Special handling for greeting messages with symptoms to fix first message issue
-    if "hi doctor" in query.lower() or "hello doctor" in query.lower():
-        # Check for key symptoms in the message
-        common_symptoms = ["fever", "cough", "cold", "headache", "pain", "nausea", 
-                          "sore throat", "runny nose", "congestion"]
-        
-        # If symptoms are found in the greeting, make sure to process with symptom command
-        for symptom in common_symptoms:
-            if symptom in query.lower():
-                # Force process as symptom
-                print(f"Detected symptom '{symptom}' in greeting - forcing symptom handling")
-                decision = ["symptom " + query]
-                break
-        else:
-            # Normal decision if no symptoms found
-            decision = FirstLayerDMM(query)
+    # An uploaded image always goes to the vision model, together with any typed text
+    if image_path:
+        SetImageUpload("None")
+        decision = ["vision " + query]
+    elif decision_mode == "fused":
+        # One Groq round trip returns both the intent and the reply
+        stream = ChatBotStream(QueryModifier(query), fused=True)
+        await speak_streamed_answer(stream)
+        print(f"Decision (fused): {stream.intent}")
+        if stream.intent == "exit":
+            os._exit(1)
+        return True
     else:
-        # Normal processing for non-greeting messages
+        # Greetings with symptoms and other common turns are settled by
+        # FirstLayerDMM's local rules without a Cohere round trip
         decision = FirstLayerDMM(query)
         
     print(f"Decision: {decision}")
@@ -232,7 +271,11 @@ async def main_execution():
         if "symptom " in command:
             SetAssistantStatus("Thinking...")
             final_query = command.replace("symptom ", "")
-            answer = ChatBot(QueryModifier(final_query))  # Text/voice mode
+            await speak_streamed_answer(ChatBotStream(QueryModifier(final_query)))  # Text/voice mode
+            return True
+        elif "vision " in command and image_path:
+            final_query = command.replace("vision ", "")
+            answer = ChatBot(QueryModifier(final_query), image_path=image_path)
             ShowTextToScreen(f"{assistant_name} : {answer}")
             SetAssistantStatus("Answering...")
             await TTS(answer)
@@ -252,6 +295,16 @@ class AsyncWorker(QObject):
         super().__init__()
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self.input_ready = asyncio.Event()
+        bus.add_listener(self.on_event)
+        
+    def on_event(self, event):
+        """Wake the worker when input arrives; may be called from any thread"""
+        if isinstance(event, (TextSubmitted, MicrophoneToggled, ImageUploaded)):
+            self.loop.call_soon_threadsafe(self.input_ready.set)
+        
+    def has_input(self):
+        return GetMicrophoneStatus() == "True" or GetTextInput() or GetImageUpload()
         
     def run(self):
         self.loop.run_until_complete(self.run_main_execution())
@@ -259,21 +312,25 @@ class AsyncWorker(QObject):
         
     async def run_main_execution(self):
         while True:
-            current_status = GetMicrophoneStatus()
-            text_input_exists = GetTextInput()
-            
-            if current_status == "True" or text_input_exists:
+            if self.has_input():
                 await main_execution()
-            else:
-                ai_status = GetAssistantStatus()
-                if "Available..." in ai_status:
-                    await asyncio.sleep(0.1)
-                else:
-                    SetAssistantStatus("Available...")
+                continue
+            
+            if "Available..." not in GetAssistantStatus():
+                SetAssistantStatus("Available...")
+            
+            # Block until the GUI submits text, toggles the mic or uploads an image.
+            # Clearing before the re-check avoids missing input that arrived in between.
+            self.input_ready.clear()
+            if not self.has_input():
+                await self.input_ready.wait()
 
 def main():
     initial_execution()
     
+    # The diagnosis panel updates whenever background enrichment finishes
+    demographic_enricher.add_listener(ShowDiagnosis)
+    
     # Create a worker thread for async operations
     worker = AsyncWorker()
     worker_thread = threading.Thread(target=worker.run, daemon=True)
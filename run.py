@@ -59,6 +59,20 @@ def check_data_directories():
     
     return True
 
+def check_knowledge_base():
+    """Compile medical_knowledge.py if the compiled knowledge base is missing or stale"""
+    try:
+        from build_knowledge_base import KNOWLEDGE_PATH, build_knowledge_base
+        if (not os.path.exists(KNOWLEDGE_PATH)
+                or os.path.getmtime("medical_knowledge.py") > os.path.getmtime(KNOWLEDGE_PATH)):
+            print("Compiled knowledge base not found or out of date. Building...")
+            build_knowledge_base()
+    except Exception as e:
+        print(f"Error building knowledge base: {e}")
+        return False
+    
+    return True
+
 def install_requirements():
     """Install required packages"""
     try:
@@ -87,6 +101,11 @@ def main():
     if not check_data_directories():
         return
     
+    # Check compiled knowledge base
+    print("Checking knowledge base...")
+    if not check_knowledge_base():
+        return
+    
     # Check vector store
     print("Checking vector store...")
     if not check_vectorstore():
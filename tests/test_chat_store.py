@@ -0,0 +1,20 @@
+from Backend.ChatStore import ConversationStore
+
+def test_append_after_torn_line_keeps_new_messages(tmp_path):
+    path = tmp_path / "ChatLog.jsonl"
+    path.write_text('{"role": "user", "content": "hi"}\n{"role": "assis', encoding="utf-8")
+
+    ConversationStore(str(path)).append({"role": "user", "content": "fever"})
+
+    assert ConversationStore(str(path)).messages() == [
+        {"role": "user", "content": "hi"},
+        {"role": "user", "content": "fever"},
+    ]
+
+def test_append_to_new_file(tmp_path):
+    path = tmp_path / "ChatLog.jsonl"
+    store = ConversationStore(str(path))
+    store.append({"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"})
+
+    assert path.read_text(encoding="utf-8").count("\n") == 2
+    assert ConversationStore(str(path)).messages() == store.messages()
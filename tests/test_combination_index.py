@@ -0,0 +1,22 @@
+from connect_memory_to_llm_simple import COMBINATION_INDEX_LIMIT, CombinationIndex, combination_indexes, rank_combinations
+
+def test_separate_temporary_dicts_are_matched_against_their_own_combinations():
+    # Each dict is freed after the call, so CPython may give the next one the same id
+    first = rank_combinations(["fever", "cough"], combinations={("fever", "cough"): {"diagnosis": "Flu"}})
+    second = rank_combinations(["rash", "itching"], combinations={("rash", "itching"): {"diagnosis": "Eczema"}})
+    assert first[0][1]["diagnosis"] == "Flu"
+    assert second[0][1]["diagnosis"] == "Eczema"
+
+def test_many_temporary_dicts():
+    for i in range(300):
+        ranked = rank_combinations([f"symptom{i}", "fatigue"],
+                                   combinations={(f"symptom{i}", "fatigue"): {"diagnosis": f"Condition {i}"}})
+        assert ranked[0][1]["diagnosis"] == f"Condition {i}"
+    assert len(combination_indexes) <= COMBINATION_INDEX_LIMIT
+
+def test_sync_with_another_dict_of_the_same_size_reindexes():
+    index = CombinationIndex()
+    index.sync({("fever", "cough"): {"diagnosis": "Flu"}})
+    index.sync({("rash", "itching"): {"diagnosis": "Eczema"}})
+    assert index.rank(["rash", "itching"])[0][1]["diagnosis"] == "Eczema"
+    assert index.rank(["fever", "cough"]) == []
@@ -0,0 +1,23 @@
+import pytest
+from Backend.Chatbot import ChatBotStream
+
+def read_streamed(reply, chunk_size=3):
+    """Feed the reply to read_intent in chunks as the stream does; returns (intent, text after the header)"""
+    stream = ChatBotStream("query", fused=True)
+    header = ""
+    for start in range(0, len(reply), chunk_size):
+        header += reply[start:start + chunk_size]
+        rest = stream.read_intent(header)
+        if rest is not None:
+            return stream.intent, rest + reply[start + chunk_size:]
+    return stream.intent, None
+
+@pytest.mark.parametrize("reply, intent, text", [
+    ("INTENT: symptom\nHow long have you had the fever?", "symptom", "How long have you had the fever?"),
+    ("INTENT: symptom. I think you have a cold, how long has it lasted?", "symptom",
+     "I think you have a cold, how long has it lasted?"),
+    ("INTENT: exit - Take care, goodbye!", "exit", "Take care, goodbye!"),
+    ("How long have you had the fever?\nAny other symptoms?", "symptom", "How long have you had the fever?\nAny other symptoms?"),
+])
+def test_reply_after_the_intent_is_kept(reply, intent, text):
+    assert read_streamed(reply) == (intent, text)
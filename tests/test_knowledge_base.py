@@ -0,0 +1,18 @@
+import marshal
+import connect_memory_to_llm_simple as rag
+
+def test_missing_compiled_file_is_written_and_then_used(tmp_path, monkeypatch):
+    path = str(tmp_path / "Data" / "MedicalKnowledge.marshal")
+    monkeypatch.setattr(rag, "KNOWLEDGE_PATH", path)
+    monkeypatch.setattr(rag, "knowledge", None)
+
+    compiled = rag.load_knowledge()
+    with open(path, "rb") as f:
+        assert marshal.loads(f.read()) == compiled
+
+    # A fresh start loads the file instead of compiling medical_knowledge.py again
+    def fail():
+        raise AssertionError("compiled the source instead of loading the file")
+    monkeypatch.setattr(rag, "compile_knowledge", fail)
+    monkeypatch.setattr(rag, "knowledge", None)
+    assert rag.load_knowledge() == compiled
@@ -0,0 +1,14 @@
+import pytest
+from Backend.Model import LocalDecision
+
+@pytest.mark.parametrize("prompt", ["I have to go now, bye", "I feel much better now, goodbye"])
+def test_goodbye_after_other_words_is_left_to_cohere(prompt):
+    assert LocalDecision(prompt) is None
+
+@pytest.mark.parametrize("prompt", ["bye", "Okay, thanks, goodbye doctor!"])
+def test_plain_goodbye_exits(prompt):
+    assert LocalDecision(prompt) == ["exit"]
+
+@pytest.mark.parametrize("prompt", ["I have a fever and a cough", "quit smoking last year, now my chest hurts"])
+def test_symptoms_are_settled_locally(prompt):
+    assert LocalDecision(prompt) == [f"symptom {prompt}"]
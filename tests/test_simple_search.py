@@ -0,0 +1,72 @@
+import pytest
+from connect_memory_to_llm_simple import SEARCH_INDEX_LIMIT, SearchIndex, search_indexes, simple_search
+
+@pytest.mark.parametrize("query, diagnosis", [
+    ("my chest hurts", "Possible Heart Attack - MEDICAL EMERGENCY"),
+    ("chest pain and shortness of breath", "Possible Heart Attack - MEDICAL EMERGENCY"),
+    ("lower back pain", "Lower Back Pain/Strain"),
+    ("sore throat", "Viral Pharyngitis"),
+    ("pain in lower right abdomen", "Possible Appendicitis - REQUIRES MEDICAL ATTENTION"),
+    ("painful blistering rash", "Shingles"),
+    ("i feel sad and hopeless", "Depression"),
+    ("sad", "Depression"),
+    ("frequent urination", "Possible Diabetes"),
+    ("can't sleep at night", "Depression"),
+    ("ear ache", "Influenza (Flu)"),
+])
+def test_known_queries_rank_expected_condition_first(query, diagnosis):
+    _, top = simple_search(query)
+    assert top["diagnosis"] == diagnosis
+
+@pytest.mark.parametrize("query", ["xyzzy", "tired all the time"])
+def test_unknown_query_returns_general_advice(query):
+    text, top = simple_search(query)
+    assert top is None and "General Health Advice" in text
+
+def test_condition_matching_a_minority_of_the_query_is_left_out():
+    data = {"cold": {"info": "Cold\nRunny nose and sneezing.", "diagnosis": "Common Cold"}}
+    index = SearchIndex()
+    index.sync(data)
+    assert index.search("runny eyes and itchy skin", min_share=0.5) == []
+    assert index.search("runny nose", min_share=0.5)[0][0] == "cold"
+
+def test_strict_conditions_need_the_match_in_name_or_overview():
+    data = {"stroke": {"info": "Stroke\nFace drooping.\n\nWhen to act:\nDrooping is urgent.", "diagnosis": "Stroke"}}
+    index = SearchIndex()
+    index.sync(data)
+    assert index.search("urgent", min_share=0.5, strict=lambda condition: True) == []
+    assert index.search("urgent", min_share=0.5)[0][0] == "stroke"
+
+def test_name_outweighs_info_mentions():
+    data = {
+        "sprain": {"info": "Sprain\nA stretched ligament.\n\nTreatment:\n- Rest", "diagnosis": "Sprain"},
+        "fracture": {"info": "Fracture\nA broken bone, often mistaken for a sprain or sprain-like injury; sprain sprain.", "diagnosis": "Fracture"},
+    }
+    index = SearchIndex()
+    index.sync(data)
+    assert index.search("sprain", k=1)[0][0] == "sprain"
+
+def test_add_and_remove_update_the_index():
+    data = {"cold": {"info": "Cold\nRunny nose.", "diagnosis": "Common Cold"}}
+    index = SearchIndex()
+    index.sync(data)
+    index.add("gout", {"info": "Gout\nSwollen big toe.", "diagnosis": "Gout"})
+    assert index.search("toe", k=1)[0][0] == "gout"
+    index.remove("gout")
+    assert index.search("toe") == []
+
+def test_temporary_dicts_get_their_own_index():
+    for i in range(300):
+        name = f"condition{i}"
+        data = {name: {"info": f"{name}\nA rash.", "diagnosis": name,
+                       "recommendations": [], "avoid": [], "follow_up": ""}}
+        _, top = simple_search(name, data=data)
+        assert top["diagnosis"] == name
+    assert len(search_indexes) <= SEARCH_INDEX_LIMIT
+
+def test_sync_with_another_dict_of_the_same_size_reindexes():
+    index = SearchIndex()
+    index.sync({"cold": {"info": "Cold\nRunny nose.", "diagnosis": "Common Cold"}})
+    index.sync({"gout": {"info": "Gout\nSwollen big toe.", "diagnosis": "Gout"}})
+    assert index.search("toe", k=1)[0][0] == "gout"
+    assert index.search("nose") == []
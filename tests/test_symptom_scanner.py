@@ -0,0 +1,16 @@
+from connect_memory_to_llm_simple import SymptomScanner, extract_symptoms_from_query
+
+def test_plural_and_ing_forms_match():
+    query = "I have headaches, fevers and night sweats; coughing a lot, sore throat"
+    assert extract_symptoms_from_query(query) == ["headache", "fever", "night sweats", "cough", "sore throat"]
+
+def test_past_tense_and_es_forms_match():
+    scanner = SymptomScanner(["rash", "vomit", "bloat"])
+    assert [symptom for _, _, symptom in scanner.scan("Rashes after I vomited, bloating")] == ["rash", "vomit", "bloat"]
+
+def test_matches_stay_on_word_boundaries():
+    scanner = SymptomScanner(["ache", "gas"])
+    assert scanner.scan("headache and gastric upset") == []
+
+def test_longest_match_wins():
+    assert extract_symptoms_from_query("Night sweats every day") == ["night sweats"]